@@ -0,0 +1,61 @@
+"""payment_metadata_to_jsonb
+
+Revision ID: a7d3e9f2b5c8
+Revises: f1a8b4c6e2d9
+Create Date: 2025-12-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f2b5c8'
+down_revision: Union[str, None] = 'f1a8b4c6e2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # payment_metadata held JSON serialized into a string column. Store it as
+    # JSONB on PostgreSQL so it can be merged in SQL; SQLite keeps JSON text.
+    is_postgresql = op.get_context().dialect.name == 'postgresql'
+    
+    if is_postgresql:
+        # Legacy values that are not valid JSON are kept as JSON strings
+        # instead of aborting the migration
+        op.execute("""
+            CREATE FUNCTION pg_temp.try_jsonb(value text) RETURNS jsonb AS $$
+            BEGIN
+                RETURN value::jsonb;
+            EXCEPTION WHEN others THEN
+                RETURN to_jsonb(value);
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE
+        """)
+    
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column(
+            'payment_metadata',
+            existing_type=sa.String(),
+            type_=sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'),
+            existing_nullable=True,
+            postgresql_using='pg_temp.try_jsonb(payment_metadata)'
+        )
+    
+    if is_postgresql:
+        op.execute("DROP FUNCTION pg_temp.try_jsonb(text)")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column(
+            'payment_metadata',
+            existing_type=sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'),
+            type_=sa.String(),
+            existing_nullable=True,
+            postgresql_using='payment_metadata::text'
+        )
@@ -0,0 +1,44 @@
+"""add_enrollment_completed_content_count
+
+Revision ID: b3c9e5d7f1a2
+Revises: a7d3e9f2b5c8
+Create Date: 2025-12-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c9e5d7f1a2'
+down_revision: Union[str, None] = 'a7d3e9f2b5c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Denormalized count of completed published content per enrollment, so
+    # progress updates no longer recount all of a user's progress rows
+    op.add_column(
+        'enrollments',
+        sa.Column('completed_content_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    
+    # Backfill from existing progress
+    op.execute("""
+        UPDATE enrollments SET completed_content_count = (
+            SELECT COUNT(user_progress.id)
+            FROM user_progress
+            JOIN content ON content.id = user_progress.content_id
+            WHERE user_progress.user_id = enrollments.user_id
+              AND user_progress.is_completed = true
+              AND content.is_published = true
+        )
+    """)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.drop_column('completed_content_count')
@@ -0,0 +1,51 @@
+"""add_partial_progress_indexes
+
+Revision ID: c8d2f4a6b9e1
+Revises: b3c9e5d7f1a2
+Create Date: 2025-12-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d2f4a6b9e1'
+down_revision: Union[str, None] = 'b3c9e5d7f1a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently on PostgreSQL so progress writes are not blocked
+    with op.get_context().autocommit_block():
+        # Supports completion counts:
+        # SELECT ... FROM user_progress WHERE user_id = ? AND is_completed = true
+        op.create_index(
+            'ix_user_progress_completed_content',
+            'user_progress',
+            ['user_id', 'content_id'],
+            postgresql_where=sa.text('is_completed = true'),
+            sqlite_where=sa.text('is_completed = 1'),
+            postgresql_concurrently=True
+        )
+        
+        # Supports published content lookups in sequential access checks:
+        # SELECT ... FROM content WHERE module_id = ? AND is_published = true ORDER BY order_index
+        op.create_index(
+            'ix_content_module_published_order',
+            'content',
+            ['module_id', 'order_index'],
+            postgresql_where=sa.text('is_published = true'),
+            sqlite_where=sa.text('is_published = 1'),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    # Remove indexes in reverse order
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_content_module_published_order', 'content', postgresql_concurrently=True)
+        op.drop_index('ix_user_progress_completed_content', 'user_progress', postgresql_concurrently=True)
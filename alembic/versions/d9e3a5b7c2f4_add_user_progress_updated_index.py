@@ -0,0 +1,37 @@
+"""add_user_progress_updated_index
+
+Revision ID: d9e3a5b7c2f4
+Revises: c8d2f4a6b9e1
+Create Date: 2025-12-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e3a5b7c2f4'
+down_revision: Union[str, None] = 'c8d2f4a6b9e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently on PostgreSQL so progress writes are not blocked
+    with op.get_context().autocommit_block():
+        # Supports the last accessed content lookup:
+        # SELECT content_id FROM user_progress WHERE user_id = ? ORDER BY updated_at DESC
+        op.create_index(
+            'ix_user_progress_user_updated',
+            'user_progress',
+            ['user_id', 'updated_at'],
+            postgresql_include=['content_id'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_progress_user_updated', 'user_progress', postgresql_concurrently=True)
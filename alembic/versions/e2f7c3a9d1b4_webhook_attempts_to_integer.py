@@ -0,0 +1,49 @@
+"""webhook_attempts_to_integer
+
+Revision ID: e2f7c3a9d1b4
+Revises: d4e8a9b2c1f0
+Create Date: 2025-12-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f7c3a9d1b4'
+down_revision: Union[str, None] = 'd4e8a9b2c1f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # webhook_attempts was stored as a stringified integer; make it a real
+    # integer so it can be incremented atomically and compared in SQL
+    op.execute("UPDATE payments SET webhook_attempts = '0' WHERE webhook_attempts IS NULL")
+    
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column(
+            'webhook_attempts',
+            existing_type=sa.String(),
+            type_=sa.Integer(),
+            nullable=False,
+            # Legacy non-numeric values count as no attempts instead of
+            # aborting the migration (the old code fell back to 0 as well)
+            postgresql_using=(
+                r"CASE WHEN webhook_attempts ~ '^\d{1,9}$' "
+                r"THEN webhook_attempts::integer ELSE 0 END"
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column(
+            'webhook_attempts',
+            existing_type=sa.Integer(),
+            type_=sa.String(),
+            nullable=True,
+            postgresql_using='webhook_attempts::varchar'
+        )
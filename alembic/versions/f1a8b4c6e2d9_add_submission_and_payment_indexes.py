@@ -0,0 +1,43 @@
+"""add_submission_and_payment_indexes
+
+Revision ID: f1a8b4c6e2d9
+Revises: e2f7c3a9d1b4
+Create Date: 2025-12-15 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a8b4c6e2d9'
+down_revision: Union[str, None] = 'e2f7c3a9d1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Supports: SELECT * FROM exercise_submissions WHERE exercise_id = ? ORDER BY submitted_at DESC
+    op.create_index(
+        'ix_exercise_submissions_exercise_submitted',
+        'exercise_submissions',
+        ['exercise_id', sa.text('submitted_at DESC')]
+    )
+    
+    # Partial index for the pending-payment expiry sweep and webhook retry scan
+    # Supports: SELECT * FROM payments WHERE status = 'pending' AND expires_at < ?
+    op.create_index(
+        'ix_payments_pending_expires_at',
+        'payments',
+        ['expires_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    # Remove indexes in reverse order
+    op.drop_index('ix_payments_pending_expires_at', 'payments')
+    op.drop_index('ix_exercise_submissions_exercise_submitted', 'exercise_submissions')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey, Enum, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
@@ -40,4 +40,12 @@ class Content(Base):
 
     __table_args__ = (
         UniqueConstraint('module_id', 'order_index', name='uq_content_module_order'),
+        # Partial index for published content lookups by module and position
+        Index(
+            'ix_content_module_published_order',
+            module_id,
+            order_index,
+            postgresql_where=(is_published == True),
+            sqlite_where=(is_published == True)
+        ),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Numeric, ForeignKey
 from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
@@ -17,5 +17,6 @@ class Enrollment(Base):
     enrolled_at = Column(DateTime, default=func.now(), nullable=False, index=True)  # Index for analytics queries
     completed_at = Column(DateTime, index=True)
     progress_percentage = Column(Numeric(5, 2), default=0.00, nullable=False)
+    completed_content_count = Column(Integer, default=0, nullable=False)  # Completed published content, maintained by progress updates
     last_accessed_module_id = Column(String, ForeignKey("modules.id", ondelete="SET NULL"))
     last_accessed_at = Column(DateTime)
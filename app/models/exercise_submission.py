@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
@@ -20,4 +20,6 @@ class ExerciseSubmission(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'exercise_id', name='uq_user_exercise_submission'),
+        # Supports listing an exercise's submissions newest first
+        Index('ix_exercise_submissions_exercise_submitted', exercise_id, submitted_at.desc()),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, Enum, Integer, Index, JSON
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -26,12 +26,23 @@ class Payment(Base):
     ipay_transaction_id = Column(String(255))
     ipay_reference = Column(String(255))
     payment_method = Column(String(50))
-    payment_metadata = Column(String)  # JSON string for SQLite compatibility
+    payment_metadata = Column(JSON().with_variant(JSONB, "postgresql"))  # JSONB on PostgreSQL, JSON text on SQLite
     expires_at = Column(DateTime)  # Payment expiry time (30 minutes from creation)
-    webhook_attempts = Column(String, default="0")  # Number of webhook retry attempts
+    webhook_attempts = Column(Integer, default=0, nullable=False)  # Number of webhook retry attempts
     created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     
+    __table_args__ = (
+        # Partial index for the expiry sweep and webhook retry scans, which
+        # only ever look at pending payments
+        Index(
+            'ix_payments_pending_expires_at',
+            expires_at,
+            postgresql_where=(status == PaymentStatus.PENDING.value),
+            sqlite_where=(status == PaymentStatus.PENDING.value)
+        ),
+    )
+    
     def is_expired(self) -> bool:
         """Check if payment has expired."""
         if not self.expires_at:
@@ -40,8 +51,4 @@ class Payment(Base):
     
     def can_retry_webhook(self) -> bool:
         """Check if webhook can be retried (max 5 attempts)."""
-        try:
-            attempts = int(self.webhook_attempts or "0")
-            return attempts < 5
-        except:
-            return True
+        return (self.webhook_attempts or 0) < 5
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from datetime import datetime
 import uuid
@@ -21,4 +21,19 @@ class UserProgress(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'content_id', name='uq_user_progress'),
+        # Partial index for completion counts, which only look at completed rows
+        Index(
+            'ix_user_progress_completed_content',
+            user_id,
+            content_id,
+            postgresql_where=(is_completed == True),
+            sqlite_where=(is_completed == True)
+        ),
+        # Covers the "most recently touched content" lookup, newest first
+        Index(
+            'ix_user_progress_user_updated',
+            user_id,
+            updated_at,
+            postgresql_include=['content_id']
+        ),
     )
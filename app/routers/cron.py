@@ -5,6 +5,7 @@ These endpoints should be called by Vercel Cron or external schedulers.
 from fastapi import APIRouter, Header, HTTPException, Request
 from app.config import settings
 from app.tasks.payment_tasks import expire_old_payments, retry_failed_webhooks
+from app.tasks.progress_tasks import reconcile_enrollment_progress
 import logging
 
 logger = logging.getLogger(__name__)
@@ -71,3 +72,20 @@ async def cron_retry_webhooks(request: Request, authorization: str = Header(None
     except Exception as e:
         logger.error(f"Cron job failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reconcile-progress")
+async def cron_reconcile_progress(request: Request, authorization: str = Header(None)):
+    """
+    Resync enrollment progress and completed content counts.
+    Should be called weekly by Vercel Cron.
+    """
+    await verify_cron_secret(request, authorization)
+    
+    try:
+        reconcile_enrollment_progress()
+        logger.info("Cron job: Reconciled enrollment progress")
+        return {"status": "success", "message": "Enrollment progress reconciled"}
+    except Exception as e:
+        logger.error(f"Cron job failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-import json
 import os
 import logging
 
@@ -163,12 +162,12 @@ async def payment_callback(request: Request, db: Session = Depends(get_db)):
                     ipay_transaction_id=transaction_id,
                     ipay_reference=callback_data.get("msisdn_idnum"),
                     payment_method=callback_data.get("channel"),
-                    metadata=json.dumps({
+                    metadata={
                         **callback_data,
                         "error": "Amount mismatch",
                         "expected_amount": expected_amount,
                         "received_amount": callback_amount
-                    })
+                    }
                 )
                 
                 return RedirectResponse(
@@ -191,7 +190,7 @@ async def payment_callback(request: Request, db: Session = Depends(get_db)):
             ipay_transaction_id=transaction_id,
             ipay_reference=callback_data.get("msisdn_idnum"),
             payment_method=callback_data.get("channel"),
-            metadata=json.dumps(callback_data)
+            metadata=callback_data
         )
         
         logger.info(f"Payment {payment.id} updated to {new_status}")
@@ -312,9 +311,7 @@ async def get_enrollment_status(
     
     Returns enrollment details, payment status, and signature status.
     """
-    status_data = enrollment_service.get_enrollment_status(db, current_user.id)
-    
-    return EnrollmentStatusResponse(**status_data)
+    return enrollment_service.get_enrollment_status(db, current_user.id)
 
 
 @router.get("/test-callback")
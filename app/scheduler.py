@@ -6,6 +6,7 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 import logging
 from app.tasks.payment_tasks import expire_old_payments, retry_failed_webhooks
+from app.tasks.progress_tasks import reconcile_enrollment_progress
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,16 @@ def start_scheduler():
     )
     logger.info("Scheduled task: Retry failed webhooks (every 10 minutes)")
     
+    # Task 3: Resync denormalized enrollment progress weekly
+    scheduler.add_job(
+        func=reconcile_enrollment_progress,
+        trigger=IntervalTrigger(weeks=1),
+        id='reconcile_enrollment_progress',
+        name='Reconcile enrollment progress',
+        replace_existing=True
+    )
+    logger.info("Scheduled task: Reconcile enrollment progress (weekly)")
+    
     scheduler.start()
     logger.info("Background scheduler started")
 
@@ -2,25 +2,115 @@
 Email templates for the Financially Fit World platform.
 
 This module contains HTML and plain text templates for all transactional emails.
-Templates are designed to be responsive and accessible.
+Templates are designed to be responsive and accessible. Styles are inlined into
+the markup once at import time, since many mail clients strip <style> blocks.
+
+Templates are plain module-level format strings, so they are parsed once when
+the module is compiled; rendering is str.format/str.join over HTML-escaped
+values and needs no template engine.
 """
 
-from typing import Tuple
+import gzip
+import re
+import string
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+
+class EmailBody(NamedTuple):
+    """Rendered email body in both HTML and plain text form."""
+
+    html: str
+    text: str
+
+
+_ESCAPE_RE = re.compile(r"[&<>\"']")
+_ESCAPE_MAP = {
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+}
+
+
+def _esc(value: str) -> str:
+    """Escape a user-supplied value for interpolation into HTML."""
+    return _ESCAPE_RE.sub(lambda m: _ESCAPE_MAP[m.group(0)], value)
+
+
+# Inline style declarations keyed by class name (or bare tag name for
+# headings and paragraphs). ``{c}`` is replaced with the accent color.
+_STYLES = {
+    "email-body": "margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; line-height: 1.6; color: #333333; background-color: #f3f4f6;",
+    "email-wrapper": "width: 100%; background-color: #f3f4f6; padding: 20px 0;",
+    "email-container": "max-width: 600px; margin: 0 auto; background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);",
+    "email-header": "background-color: #ffffff; padding: 40px 20px; text-align: center; border-bottom: 1px solid #e5e7eb;",
+    "email-logo": "max-width: 200px; height: auto; margin: 0 auto; display: block;",
+    "email-content": "padding: 40px 30px; background-color: #ffffff;",
+    "h3": "margin: 0 0 20px 0; font-size: 18px; font-weight: 600; color: #111827;",
+    "p": "margin: 0 0 16px 0; font-size: 16px; color: #4b5563;",
+    "button": "display: inline-block; padding: 14px 40px; background-color: {c}; color: #ffffff !important; text-decoration: none; border-radius: 2px; font-weight: 400; font-size: 16px; margin: 20px 0;",
+    "button-container": "text-align: center; margin: 30px 0;",
+    "link-text": "word-break: break-all; color: {c}; font-size: 14px; padding: 10px; background-color: #f9fafb; border-radius: 4px; display: inline-block; margin: 10px 0;",
+    "info-box": "background-color: #f9fafb; border-left: 4px solid {c}; padding: 20px; margin: 20px 0; border-radius: 4px;",
+    "certificate-box": "background-color: #ffffff; border: 2px solid {c}; border-radius: 8px; padding: 30px; margin: 30px 0; text-align: center;",
+    "certificate-title": "margin: 0 0 15px 0; font-size: 22px; font-weight: 600; color: {c};",
+    "certificate-id": "font-family: 'Courier New', monospace; font-size: 18px; font-weight: bold; color: #111827; background-color: #f3f4f6; padding: 10px 20px; border-radius: 4px; display: inline-block; margin: 10px 0;",
+    "email-footer": "background-color: #f9fafb; padding: 30px; text-align: center; color: #6b7280; font-size: 14px; border-top: 1px solid #e5e7eb;",
+    "footer-text": "margin: 5px 0; color: #6b7280;",
+    "footer-note": "margin: 15px 0 5px 0; color: #6b7280; font-size: 12px;",
+    "divider": "height: 1px; background-color: #e5e7eb; margin: 30px 0;",
+}
+
+_CLASS_ATTR_RE = re.compile(r'class="([\w-]+)"')
+_BARE_TAG_RE = re.compile(r'<(h3|p)(?: style="([^"]*)")?>')
+_TAG_GAP_RE = re.compile(r"(?<=[>}])[ \t]*\n\s*(?=[<{])")
+_LINE_BREAK_RE = re.compile(r"[ \t]*\n\s*")
+
+
+@lru_cache(maxsize=None)
+def _styles(header_color: str) -> Dict[str, str]:
+    """Resolve the inline style declarations for an accent color."""
+    return {name: declarations.format(c=header_color) for name, declarations in _STYLES.items()}
+
+
+def _inline_css(html: str, header_color: str = "#049ad1") -> str:
+    """
+    Inline the shared styles into template markup.
+    
+    Bare ``<h3>``/``<p>`` tags get the default heading/paragraph styles (any
+    existing inline style is kept and takes precedence), then every
+    ``class="..."`` attribute is replaced with the matching declarations.
+    Mail clients frequently strip ``<style>`` blocks, so templates are run
+    through this once at import time rather than on every send. The result
+    is minified as well.
+    """
+    styles = _styles(header_color)
 
+    def tag_style(match: re.Match) -> str:
+        tag, existing = match.group(1), match.group(2)
+        declarations = f"{styles[tag]} {existing}" if existing else styles[tag]
+        return f'<{tag} style="{declarations}">'
 
-def get_base_template(title: str, content: str, header_color: str = "#049ad1") -> str:
+    html = _BARE_TAG_RE.sub(tag_style, html)
+    html = _CLASS_ATTR_RE.sub(lambda m: f'style="{styles[m.group(1)]}"', html)
+    return _minify(html)
+
+
+def _minify(html: str) -> str:
     """
-    Get base HTML template with consistent styling.
+    Drop source indentation from template markup.
     
-    Args:
-        title: Email title for header
-        content: HTML content to insert
-        header_color: Background color for header
-        
-    Returns:
-        Complete HTML email template
+    Whitespace runs containing a newline are removed between tags (and
+    around format placeholders that sit between tags) and collapsed to a
+    single space inside text, which renders identically.
     """
-    return f"""
+    html = _TAG_GAP_RE.sub("", html)
+    return _LINE_BREAK_RE.sub(" ", html).strip()
+
+
+_BASE_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -28,160 +118,20 @@ def get_base_template(title: str, content: str, header_color: str = "#049ad1") -
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <meta http-equiv="X-UA-Compatible" content="IE=edge">
     <title>{title}</title>
-    <style>
-        body {{
-            margin: 0;
-            padding: 0;
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333333;
-            background-color: #f3f4f6;
-        }}
-        .email-wrapper {{
-            width: 100%;
-            background-color: #f3f4f6;
-            padding: 20px 0;
-        }}
-        .email-container {{
-            max-width: 600px;
-            margin: 0 auto;
-            background-color: #ffffff;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
-        }}
-        .email-header {{
-            background-color: #ffffff;
-            padding: 40px 20px;
-            text-align: center;
-            border-bottom: 1px solid #e5e7eb;
-        }}
-        .email-header img {{
-            max-width: 200px;
-            height: auto;
-            margin: 0 auto;
-            display: block;
-        }}
-        .email-content {{
-            padding: 40px 30px;
-            background-color: #ffffff;
-        }}
-        .email-content h3 {{
-            margin: 0 0 20px 0;
-            font-size: 18px;
-            font-weight: 600;
-            color: #111827;
-        }}
-        .email-content p {{
-            margin: 0 0 16px 0;
-            font-size: 16px;
-            color: #4b5563;
-        }}
-        .button {{
-            display: inline-block;
-            padding: 14px 40px;
-            background-color: {header_color};
-            color: #ffffff !important;
-            text-decoration: none;
-            border-radius: 2px;
-            font-weight: 400;
-            font-size: 16px;
-            margin: 20px 0;
-            transition: background-color 0.2s;
-        }}
-        .button:hover {{
-            opacity: 0.9;
-        }}
-        .button-container {{
-            text-align: center;
-            margin: 30px 0;
-        }}
-        .link-text {{
-            word-break: break-all;
-            color: {header_color};
-            font-size: 14px;
-            padding: 10px;
-            background-color: #f9fafb;
-            border-radius: 4px;
-            display: inline-block;
-            margin: 10px 0;
-        }}
-        .info-box {{
-            background-color: #f9fafb;
-            border-left: 4px solid {header_color};
-            padding: 20px;
-            margin: 20px 0;
-            border-radius: 4px;
-        }}
-        .certificate-box {{
-            background-color: #ffffff;
-            border: 2px solid {header_color};
-            border-radius: 8px;
-            padding: 30px;
-            margin: 30px 0;
-            text-align: center;
-        }}
-        .certificate-box h3 {{
-            margin: 0 0 15px 0;
-            color: {header_color};
-            font-size: 22px;
-        }}
-        .certificate-id {{
-            font-family: 'Courier New', monospace;
-            font-size: 18px;
-            font-weight: bold;
-            color: #111827;
-            background-color: #f3f4f6;
-            padding: 10px 20px;
-            border-radius: 4px;
-            display: inline-block;
-            margin: 10px 0;
-        }}
-        .email-footer {{
-            background-color: #f9fafb;
-            padding: 30px;
-            text-align: center;
-            color: #6b7280;
-            font-size: 14px;
-            border-top: 1px solid #e5e7eb;
-        }}
-        .email-footer p {{
-            margin: 5px 0;
-            color: #6b7280;
-        }}
-        .divider {{
-            height: 1px;
-            background-color: #e5e7eb;
-            margin: 30px 0;
-        }}
-        @media only screen and (max-width: 600px) {{
-            .email-content {{
-                padding: 30px 20px;
-            }}
-            .email-header h1 {{
-                font-size: 24px;
-            }}
-            .button {{
-                display: block;
-                width: 100%;
-                box-sizing: border-box;
-            }}
-        }}
-    </style>
 </head>
-<body>
+<body class="email-body">
     <div class="email-wrapper">
         <div class="email-container">
             <div class="email-header">
-                <img src="https://ffw-frontend-ten.vercel.app/logo/logo.png" alt="Financially Fit World Logo" />
+                <img class="email-logo" src="https://ffw-frontend-ten.vercel.app/logo/logo.png" alt="Financially Fit World Logo" />
             </div>
             <div class="email-content">
                 {content}
             </div>
             <div class="email-footer">
-                <p><strong>FiNFIT World</strong></p>
-                <p>&copy; 2024 FiNFIT World. All rights reserved.</p>
-                <p style="margin-top: 15px; font-size: 12px;">
+                <p class="footer-text"><strong>FiNFIT World</strong></p>
+                <p class="footer-text">© 2024 FiNFIT World. All rights reserved.</p>
+                <p class="footer-note">
                     This is an automated message, please do not reply to this email.
                 </p>
             </div>
@@ -192,39 +142,132 @@ def get_base_template(title: str, content: str, header_color: str = "#049ad1") -
 """
 
 
-def get_verification_email_template(full_name: str, verification_url: str) -> Tuple[str, str]:
+@lru_cache(maxsize=None)
+def _base_parts(header_color: str) -> Tuple[str, str, str]:
     """
-    Get email verification template.
+    Base template with styles inlined for the given accent color, split into
+    the static text before the title, between title and content, and after
+    the content.
+    """
+    shell = _inline_css(_BASE_TEMPLATE, header_color)
+    head, rest = shell.split("{title}")
+    middle, tail = rest.split("{content}")
+    return head, middle, tail
+
+
+@lru_cache(maxsize=None)
+def _base_parts_bytes(header_color: str) -> Tuple[bytes, bytes, bytes]:
+    """UTF-8 encoded counterpart of ``_base_parts``."""
+    return tuple(part.encode("utf-8") for part in _base_parts(header_color))
+
+
+# Every template in this module uses the brand color, so prebuild its shell.
+_DEFAULT_HEADER_COLOR = "#049ad1"
+_DEFAULT_HEAD, _DEFAULT_MIDDLE, _DEFAULT_TAIL = _base_parts(_DEFAULT_HEADER_COLOR)
+
+
+@lru_cache(maxsize=32)
+def _shell_prefix(title: str, header_color: str) -> str:
+    """
+    Everything up to the content slot for a given title and color.
+    
+    Callers pass a small fixed set of titles, so the prefix is built once
+    per email type and each render only appends the content and tail.
+    """
+    if header_color == _DEFAULT_HEADER_COLOR:
+        return "".join((_DEFAULT_HEAD, title, _DEFAULT_MIDDLE))
+    head, middle, _ = _base_parts(header_color)
+    return "".join((head, title, middle))
+
+
+def get_base_template(title: str, content: str, header_color: str = "#049ad1") -> str:
+    """
+    Get base HTML template with consistent styling.
     
     Args:
-        full_name: User's full name
-        verification_url: URL for email verification
+        title: Email title for header
+        content: HTML content to insert (already inlined, see ``_inline_css``)
+        header_color: Accent color used for the inlined styles
         
     Returns:
-        Tuple of (html_content, text_content)
+        Complete HTML email template
     """
-    content = f"""
-        <h3>Hi {full_name},</h3>
-        <p>You're just one step away from unlocking your personalized fitness and finance experience.</p>
-        <p>To complete your registration and activate your account, please verify your email by clicking the link below:</p>
-        
-        <div class="button-container">
-            <a href="{verification_url}" class="button">Verify My Account</a>
-        </div>
-        
-        <p>Or copy and paste this link into your browser:</p>
-        <div class="link-text">{verification_url}</div>
-        
-        <p>If you did not create an account with FiNFIT World, please ignore this message.</p>
+    if header_color == _DEFAULT_HEADER_COLOR:
+        return _shell_prefix(title, _DEFAULT_HEADER_COLOR) + content + _DEFAULT_TAIL
+    return _shell_prefix(title, header_color) + content + _base_parts(header_color)[2]
+
+
+def get_base_template_bytes(title: str, content: str, header_color: str = "#049ad1") -> bytes:
+    """
+    Get base HTML template as UTF-8 bytes.
+    
+    Only the title and content are encoded per call; the static shell is
+    encoded once per accent color. Use this when the transport takes a raw
+    body (e.g. MIME/SMTP) rather than a JSON string.
+    
+    Args:
+        title: Email title for header
+        content: HTML content to insert
+        header_color: Accent color used for the inlined styles
         
-        <p style="margin-top: 30px;">Thank you for joining our community — we are excited to support your journey towards a stronger future!</p>
+    Returns:
+        Complete HTML email template encoded as UTF-8
+    """
+    head, middle, tail = _base_parts_bytes(header_color)
+    return b"".join((head, title.encode("utf-8"), middle, content.encode("utf-8"), tail))
+
+
+# Gzip members for the static default-color shell. Concatenated gzip members
+# decompress to the concatenation of their contents (RFC 1952, section 2.2).
+_DEFAULT_HEAD_GZ = gzip.compress(_DEFAULT_HEAD.encode("utf-8"), compresslevel=9)
+_DEFAULT_TAIL_GZ = gzip.compress(_DEFAULT_TAIL.encode("utf-8"), compresslevel=9)
+
+
+def get_base_template_gz(title: str, content: str) -> bytes:
+    """
+    Get the default-color base HTML template as a gzip stream.
+    
+    The static head and tail are compressed once at import; only the title,
+    the short markup between it and the content, and the content itself are
+    compressed per call. Intended for delivery APIs that accept
+    ``Content-Encoding: gzip`` request bodies.
+    
+    Args:
+        title: Email title for header
+        content: HTML content to insert
         
-        <p><strong>Stay fit, stay smart,</strong><br>The FiNFIT World Team</p>
+    Returns:
+        Gzip-compressed complete HTML email template
     """
+    body = "".join((title, _DEFAULT_MIDDLE, content)).encode("utf-8")
+    return b"".join((_DEFAULT_HEAD_GZ, gzip.compress(body, compresslevel=6), _DEFAULT_TAIL_GZ))
+
+
+def _render(content: str, title: str, text_name: str, values: Dict[str, str]) -> EmailBody:
+    """
+    Render an email from its HTML content template and text template.
     
-    html = get_base_template("Verify Your Email", content, "#049ad1")
+    Both halves are filled from the same values; the HTML side gets the
+    escaped copies.
     
-    text = f"""
+    Args:
+        content: Inlined HTML content template
+        title: Email title for header
+        text_name: Key into ``_TEXT_TEMPLATES``
+        values: Placeholder values, as passed by the caller
+        
+    Returns:
+        EmailBody with html and text content
+    """
+    escaped = {key: _esc(value) for key, value in values.items()}
+    html = get_base_template(title, content.format_map(escaped))
+    text = _TEXT_TEMPLATES[text_name].format_map(values)
+    return EmailBody(html, text)
+
+
+# Plain text bodies, rendered with the raw (unescaped) argument values.
+_TEXT_TEMPLATES: Dict[str, str] = {
+    "verification": """
 Verify Your Email
 
 Hi {full_name},
@@ -245,23 +288,166 @@ The FiNFIT World Team
 ---
 FiNFIT World
 © 2024 FiNFIT World. All rights reserved.
-"""
-    
-    return html, text
+""",
+    "password_reset": """
+Password Reset Request
+
+Hi {full_name},
+
+We received a request to reset the password for your FiNFIT World account.
+
+Click the button below to create a new password:
+
+{reset_url}
+
+If you did not make this request with your FiNFIT World account, please ignore this message.
+
+Thank you for joining our community — we are excited to support your journey towards a stronger future!
+
+Stay fit, stay smart,
+The FiNFIT World Team
+
+---
+FiNFIT World
+© 2024 FiNFIT World. All rights reserved.
+""",
+    "welcome": """
+Welcome to FiNFIT World
+
+We are excited to have you join a community built to help you grow, thrive, and achieve more in your financial journey.
+
+Your account is now active, and you are all set to explore everything FiNFIT World has to offer — learning resources and tailored features designed to elevate your financial independence.
+
+Here's what you can do next:
+• ✔ Log in to your dashboard
+• ✔ Set up your profile
+• ✔ Explore tools and resources made just for you
+
+Access your dashboard:
+{dashboard_url}
+
+Thank you for being part of FiNFIT World — we are excited to have you on board!
+
+Best regards,
+The FiNFIT World Team
+
+---
+FiNFIT World
+© 2024 FiNFIT World. All rights reserved.
+""",
+    "course_completion": """ Course Completed!
+
+Congratulations, {full_name}!
+
+You've done it! You have successfully completed the course, and we couldn't be more proud of your dedication and hard work throughout this learning journey.
+
+🏆 Your Certificate is Ready!
+
+Certificate ID: {cert_id}
+
+Download your certificate:
+{certificate_url}
+
+Verify Your Certificate:
+Anyone can verify the authenticity of your certificate using this link:
+{verify_url}
+
+What's Next?
+- Download and share your certificate on LinkedIn and other professional networks
+- Add your new skills to your resume and portfolio
+- Apply what you've learned in real-world projects
+- Consider leaving a review to help future students
+
+View your certificate page:
+{certificate_page_url}
+
+Thank you for being part of our learning community. We wish you continued success in your journey!
+
+---
+Financially Fit World
+© 2024 Financially Fit World. All rights reserved.
+""",
+    "signature_confirmation": """
+Signature Confirmed - Ready to Learn!
+
+Great job, {full_name}! ✅
+
+Your digital signature has been successfully submitted and recorded.
+
+✅ Enrollment Complete!
+You're all set to begin your learning journey. Your signature confirms your commitment to completing the course.
+
+What's Next?
+- Access all course modules and content
+- Watch video lectures at your own pace
+- Complete exercises and track your progress
+- Earn your certificate upon completion
+
+Ready to start learning? Access your course:
+{course_url}
+
+Pro Tip: Set aside dedicated time each day for learning. Consistency is key to successfully completing the course and achieving your goals.
+
+We're excited to support you on this learning journey. Let's get started!
+
+---
+Financially Fit World
+© 2024 Financially Fit World. All rights reserved.
+""",
+    "notification": """
+📢 {title}
+
+Hi {full_name},
+
+You have a new notification from Financially Fit World:
+
+{message}
+
+Visit your dashboard to stay updated:
+{dashboard_url}
+
+---
+Financially Fit World
+© 2024 Financially Fit World. All rights reserved.
+""",
+}
+
+
+_VERIFICATION_CONTENT = _inline_css("""
+        <h3>Hi {full_name},</h3>
+        <p>You're just one step away from unlocking your personalized fitness and finance experience.</p>
+        <p>To complete your registration and activate your account, please verify your email by clicking the link below:</p>
+        
+        <div class="button-container">
+            <a href="{verification_url}" class="button">Verify My Account</a>
+        </div>
+        
+        <p>Or copy and paste this link into your browser:</p>
+        <div class="link-text">{verification_url}</div>
+        
+        <p>If you did not create an account with FiNFIT World, please ignore this message.</p>
+        
+        <p style="margin-top: 30px;">Thank you for joining our community — we are excited to support your journey towards a stronger future!</p>
+        
+        <p><strong>Stay fit, stay smart,</strong><br>The FiNFIT World Team</p>
+    """)
 
 
-def get_password_reset_email_template(full_name: str, reset_url: str) -> Tuple[str, str]:
+def get_verification_email_template(full_name: str, verification_url: str) -> EmailBody:
     """
-    Get password reset template.
+    Get email verification template.
     
     Args:
         full_name: User's full name
-        reset_url: URL for password reset
+        verification_url: URL for email verification
         
     Returns:
-        Tuple of (html_content, text_content)
+        EmailBody with html and text content
     """
-    content = f"""
+    return _render(_VERIFICATION_CONTENT, "Verify Your Email", "verification", locals())
+
+
+_PASSWORD_RESET_CONTENT = _inline_css("""
         <h3>Hi {full_name},</h3>
         <p>We received a request to reset the password for your FiNFIT World account.</p>
         <p>Click the button below to create a new password:</p>
@@ -278,48 +464,24 @@ def get_password_reset_email_template(full_name: str, reset_url: str) -> Tuple[s
         <p style="margin-top: 30px;">Thank you for joining our community — we are excited to support your journey towards a stronger future!</p>
         
         <p><strong>Stay fit, stay smart,</strong><br>The FiNFIT World Team</p>
-    """
-    
-    html = get_base_template("Password Reset Request", content, "#049ad1")
-    
-    text = f"""
-Password Reset Request
+    """)
 
-Hi {full_name},
-
-We received a request to reset the password for your FiNFIT World account.
-
-Click the button below to create a new password:
-
-{reset_url}
-
-If you did not make this request with your FiNFIT World account, please ignore this message.
-
-Thank you for joining our community — we are excited to support your journey towards a stronger future!
-
-Stay fit, stay smart,
-The FiNFIT World Team
 
----
-FiNFIT World
-© 2024 FiNFIT World. All rights reserved.
-"""
-    
-    return html, text
-
-
-def get_welcome_email_template(full_name: str, dashboard_url: str) -> Tuple[str, str]:
+def get_password_reset_email_template(full_name: str, reset_url: str) -> EmailBody:
     """
-    Get welcome email template for enrolled students.
+    Get password reset template.
     
     Args:
         full_name: User's full name
-        dashboard_url: URL to student dashboard
+        reset_url: URL for password reset
         
     Returns:
-        Tuple of (html_content, text_content)
+        EmailBody with html and text content
     """
-    content = f"""
+    return _render(_PASSWORD_RESET_CONTENT, "Password Reset Request", "password_reset", locals())
+
+
+_WELCOME_CONTENT = _inline_css("""
         <h3>Welcome to FiNFIT World</h3>
         <p>We are excited to have you join a community built to help you grow, thrive, and achieve more in your financial journey.</p>
         
@@ -339,64 +501,32 @@ def get_welcome_email_template(full_name: str, dashboard_url: str) -> Tuple[str,
         <p style="margin-top: 30px;">Thank you for being part of FiNFIT World — we are excited to have you on board!</p>
         
         <p><strong>Best regards,</strong><br>The FiNFIT World Team</p>
-    """
-    
-    html = get_base_template("Welcome to FiNFIT World", content, "#049ad1")
-    
-    text = f"""
-Welcome to FiNFIT World
+    """)
 
-We are excited to have you join a community built to help you grow, thrive, and achieve more in your financial journey.
-
-Your account is now active, and you are all set to explore everything FiNFIT World has to offer — learning resources and tailored features designed to elevate your financial independence.
 
-Here's what you can do next:
-• ✔ Log in to your dashboard
-• ✔ Set up your profile
-• ✔ Explore tools and resources made just for you
-
-Access your dashboard:
-{dashboard_url}
-
-Thank you for being part of FiNFIT World — we are excited to have you on board!
-
-Best regards,
-The FiNFIT World Team
-
----
-FiNFIT World
-© 2024 FiNFIT World. All rights reserved.
-"""
-    
-    return html, text
-
-
-def get_course_completion_email_template(
-    full_name: str,
-    certificate_url: str,
-    cert_id: str,
-    verify_url: str,
-    certificate_page_url: str
-) -> Tuple[str, str]:
+def get_welcome_email_template(full_name: str, dashboard_url: str) -> EmailBody:
     """
-    Get course completion email template with certificate.
+    Get welcome email template for enrolled students.
     
     Args:
         full_name: User's full name
-        certificate_url: URL to download certificate
-        cert_id: Certificate ID
-        verify_url: URL to verify certificate
-        certificate_page_url: URL to certificate page
+        dashboard_url: URL to student dashboard
         
     Returns:
-        Tuple of (html_content, text_content)
+        EmailBody with html and text content
     """
-    content = f"""
+    return _render(_WELCOME_CONTENT, "Welcome to FiNFIT World", "welcome", locals())
+
+
+@lru_cache(maxsize=None)
+def _course_completion_content() -> str:
+    """Course completion body markup, built on first use."""
+    return _inline_css("""
         <h3>Congratulations, {full_name}!</h3>
         <p>You've done it! You have successfully completed the course, and we couldn't be more proud of your dedication and hard work throughout this learning journey.</p>
         
         <div class="certificate-box">
-            <h3>🏆 Your Certificate is Ready!</h3>
+            <h3 class="certificate-title">🏆 Your Certificate is Ready!</h3>
             <p style="margin: 15px 0;">Certificate ID:</p>
             <div class="certificate-id">{cert_id}</div>
             
@@ -424,61 +554,37 @@ def get_course_completion_email_template(
         </div>
         
         <p style="margin-top: 30px;">Thank you for being part of our learning community. We wish you continued success in your journey!</p>
-    """
-    
-    html = get_base_template("Course Completed!", content, "#049ad1")
-    
-    text = f""" Course Completed!
-
-Congratulations, {full_name}!
-
-You've done it! You have successfully completed the course, and we couldn't be more proud of your dedication and hard work throughout this learning journey.
-
-🏆 Your Certificate is Ready!
-
-Certificate ID: {cert_id}
-
-Download your certificate:
-{certificate_url}
+    """)
 
-Verify Your Certificate:
-Anyone can verify the authenticity of your certificate using this link:
-{verify_url}
-
-What's Next?
-- Download and share your certificate on LinkedIn and other professional networks
-- Add your new skills to your resume and portfolio
-- Apply what you've learned in real-world projects
-- Consider leaving a review to help future students
 
-View your certificate page:
-{certificate_page_url}
-
-Thank you for being part of our learning community. We wish you continued success in your journey!
-
----
-Financially Fit World
-© 2024 Financially Fit World. All rights reserved.
-"""
-    
-    return html, text
-
-
-def get_signature_confirmation_email_template(
+def get_course_completion_email_template(
     full_name: str,
-    course_url: str
-) -> Tuple[str, str]:
+    certificate_url: str,
+    cert_id: str,
+    verify_url: str,
+    certificate_page_url: str
+) -> EmailBody:
     """
-    Get signature confirmation email template.
+    Get course completion email template with certificate.
     
     Args:
         full_name: User's full name
-        course_url: URL to course page
+        certificate_url: URL to download certificate
+        cert_id: Certificate ID
+        verify_url: URL to verify certificate
+        certificate_page_url: URL to certificate page
         
     Returns:
-        Tuple of (html_content, text_content)
+        EmailBody with html and text content
     """
-    content = f"""
+    # Sent once per student, so the markup is inlined lazily rather than at import
+    return _render(_course_completion_content(), "Course Completed!", "course_completion", locals())
+
+
+@lru_cache(maxsize=None)
+def _signature_confirmation_content() -> str:
+    """Signature confirmation body markup, built on first use."""
+    return _inline_css("""
         <h3>Great job, {full_name}! ✅</h3>
         <p>Your digital signature has been successfully submitted and recorded.</p>
         
@@ -508,39 +614,61 @@ def get_signature_confirmation_email_template(
         </p>
         
         <p style="margin-top: 30px;">We're excited to support you on this learning journey. Let's get started!</p>
-    """
-    
-    html = get_base_template("Signature Confirmed - Ready to Learn!", content, "#049ad1")
-    
-    text = f"""
-Signature Confirmed - Ready to Learn!
+    """)
 
-Great job, {full_name}! ✅
 
-Your digital signature has been successfully submitted and recorded.
+def get_signature_confirmation_email_template(
+    full_name: str,
+    course_url: str
+) -> EmailBody:
+    """
+    Get signature confirmation email template.
+    
+    Args:
+        full_name: User's full name
+        course_url: URL to course page
+        
+    Returns:
+        EmailBody with html and text content
+    """
+    return _render(_signature_confirmation_content(), "Signature Confirmed - Ready to Learn!", "signature_confirmation", locals())
 
-✅ Enrollment Complete!
-You're all set to begin your learning journey. Your signature confirms your commitment to completing the course.
 
-What's Next?
-- Access all course modules and content
-- Watch video lectures at your own pace
-- Complete exercises and track your progress
-- Earn your certificate upon completion
+_NOTIFICATION_CONTENT = _inline_css("""
+        <h3>Hi {full_name},</h3>
+        <p>You have a new notification from Financially Fit World:</p>
+        
+        <div class="info-box">
+            <p style="margin: 0; white-space: pre-wrap; font-size: 16px; line-height: 1.6;">{message}</p>
+        </div>
+        
+        <p>Visit your dashboard to stay updated with the latest course information and announcements:</p>
+        
+        <div class="button-container">
+            <a href="{dashboard_url}" class="button">Go to Dashboard</a>
+        </div>
+    """)
 
-Ready to start learning? Access your course:
-{course_url}
 
-Pro Tip: Set aside dedicated time each day for learning. Consistency is key to successfully completing the course and achieving your goals.
+# Default shell head with the notification title prefix already appended.
+_NOTIFICATION_HEAD = _DEFAULT_HEAD + "📢 "
+_NOTIFICATION_CONTENT_HEAD, _NOTIFICATION_CONTENT_TAIL = _NOTIFICATION_CONTENT.split("{full_name}")
 
-We're excited to support you on this learning journey. Let's get started!
 
----
-Financially Fit World
-© 2024 Financially Fit World. All rights reserved.
-"""
+@lru_cache(maxsize=128)
+def _notification_parts(title: str, message: str, dashboard_url: str) -> Tuple[str, str]:
+    """
+    Rendered notification HTML before and after the recipient's name.
     
-    return html, text
+    A notification goes to every student with the same title, message and
+    dashboard URL, so only the escaped name differs between recipients.
+    """
+    head = "".join((_NOTIFICATION_HEAD, _esc(title), _DEFAULT_MIDDLE, _NOTIFICATION_CONTENT_HEAD))
+    tail = _NOTIFICATION_CONTENT_TAIL.format(
+        message=_esc(message),
+        dashboard_url=_esc(dashboard_url)
+    ) + _DEFAULT_TAIL
+    return head, tail
 
 
 def get_notification_email_template(
@@ -548,7 +676,7 @@ def get_notification_email_template(
     title: str,
     message: str,
     dashboard_url: str
-) -> Tuple[str, str]:
+) -> EmailBody:
     """
     Get notification email template.
     
@@ -559,40 +687,35 @@ def get_notification_email_template(
         dashboard_url: URL to dashboard
         
     Returns:
-        Tuple of (html_content, text_content)
-    """
-    content = f"""
-        <h3>Hi {full_name},</h3>
-        <p>You have a new notification from Financially Fit World:</p>
-        
-        <div class="info-box">
-            <p style="margin: 0; white-space: pre-wrap; font-size: 16px; line-height: 1.6;">{message}</p>
-        </div>
-        
-        <p>Visit your dashboard to stay updated with the latest course information and announcements:</p>
-        
-        <div class="button-container">
-            <a href="{dashboard_url}" class="button">Go to Dashboard</a>
-        </div>
+        EmailBody with html and text content
     """
+    head, tail = _notification_parts(title, message, dashboard_url)
+    html = "".join((head, _esc(full_name), tail))
     
-    html = get_base_template(f"📢 {title}", content, "#049ad1")
-    
-    text = f"""
-📢 {title}
-
-Hi {full_name},
-
-You have a new notification from Financially Fit World:
-
-{message}
-
-Visit your dashboard to stay updated:
-{dashboard_url}
-
----
-Financially Fit World
-© 2024 Financially Fit World. All rights reserved.
-"""
+    text = _TEXT_TEMPLATES["notification"].format_map(locals())
     
-    return html, text
+    return EmailBody(html, text)
+
+
+if __debug__:
+    # Eagerly built templates must be fully resolved at import so a render is
+    # just a lookup plus str.format - no regex or CSS work per email. The
+    # rarely sent ones are resolved once, on first use.
+    def _assert_resolved(markup: str, fields: frozenset = frozenset()) -> None:
+        """Fail unless styles are inlined and only ``fields`` remain to format."""
+        assert "<style" not in markup, "unresolved <style> block"
+        assert 'class="' not in markup, "class attribute left after inlining"
+        found = frozenset(
+            name for _, name, _, _ in string.Formatter().parse(markup) if name is not None
+        )
+        assert found == fields, f"unexpected placeholders {sorted(found ^ fields)}"
+
+    for _part in (_DEFAULT_HEAD, _DEFAULT_MIDDLE, _DEFAULT_TAIL):
+        _assert_resolved(_part)
+    _assert_resolved(_VERIFICATION_CONTENT, frozenset({"full_name", "verification_url"}))
+    _assert_resolved(_PASSWORD_RESET_CONTENT, frozenset({"full_name", "reset_url"}))
+    _assert_resolved(_WELCOME_CONTENT, frozenset({"dashboard_url"}))
+    _assert_resolved(
+        _NOTIFICATION_CONTENT, frozenset({"full_name", "message", "dashboard_url"})
+    )
+    del _part
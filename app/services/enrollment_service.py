@@ -1,17 +1,34 @@
+import asyncio
 import base64
+import logging
 from typing import Optional
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
 
+from app.config import settings
 from app.models.enrollment import Enrollment
 from app.models.payment import Payment
 from app.models.user import User
+from app.schemas.enrollment import EnrollmentDetail, EnrollmentStatusResponse, PaymentDetail
 from app.services.storage_service import storage_service
 
+logger = logging.getLogger(__name__)
+
+# Base64 signature payload limit, checked before decoding: the encoded size
+# of a max_image_size image plus its data URL prefix
+SIGNATURE_DATA_URL_PREFIX = "data:image/png;base64,"
+MAX_SIGNATURE_DATA_LENGTH = (
+    4 * -(-settings.max_image_size // 3) + len(SIGNATURE_DATA_URL_PREFIX)
+)
+
 
 class EnrollmentService:
     """Service for handling course enrollment."""
     
+    # Stateless singleton; every method takes the session explicitly
+    __slots__ = ()
+    
     def create_enrollment(
         self,
         db: Session,
@@ -37,7 +54,6 @@ class EnrollmentService:
         )
         db.add(enrollment)
         db.commit()
-        db.refresh(enrollment)
         return enrollment
     
     def get_enrollment_by_user_id(
@@ -65,13 +81,12 @@ class EnrollmentService:
         Returns:
             Updated User object or None if not found
         """
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             return None
         
         user.is_enrolled = is_enrolled
         db.commit()
-        db.refresh(user)
         return user
     
     async def submit_signature(
@@ -90,37 +105,63 @@ class EnrollmentService:
             
         Returns:
             Updated Enrollment object or None if not found
+            
+        Raises:
+            HTTPException: 413 if the signature image exceeds max_image_size
         """
-        enrollment = self.get_enrollment_by_user_id(db, user_id)
-        if not enrollment:
-            return None
+        if len(signature_data) > MAX_SIGNATURE_DATA_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Signature image exceeds {settings.max_image_size // (1024 * 1024)}MB"
+            )
+        
+        # Remove data URL prefix if present (e.g., "data:image/png;base64,")
+        _, sep, encoded = signature_data.partition(",")
+        if sep:
+            signature_data = encoded
+        
+        # Start decoding in a worker thread right away so it overlaps the
+        # enrollment lookup below instead of stalling the event loop after it
+        decoded = asyncio.get_running_loop().run_in_executor(
+            None, base64.b64decode, signature_data
+        )
         
-        # Decode base64 signature data
         try:
-            # Remove data URL prefix if present (e.g., "data:image/png;base64,")
-            if "," in signature_data:
-                signature_data = signature_data.split(",")[1]
-            
-            signature_bytes = base64.b64decode(signature_data)
+            enrollment = self.get_enrollment_by_user_id(db, user_id)
+            if not enrollment:
+                return None
             
-            # Upload to Vercel Blob
-            filename = f"signatures/{user_id}_{int(datetime.utcnow().timestamp())}.png"
-            signature_url = await storage_service.upload_file(
-                file_data=signature_bytes,
-                filename=filename,
-                content_type="image/png"
-            )
-            
-            if signature_url:
-                enrollment.signature_url = signature_url
-                enrollment.signature_created_at = datetime.utcnow()
-                db.commit()
-                db.refresh(enrollment)
-                return enrollment
-            
-        except Exception as e:
-            print(f"Failed to process signature: {str(e)}")
-            return None
+            try:
+                signature_bytes = await decoded
+                
+                # One timestamp for both the blob name and signature_created_at
+                now = datetime.utcnow()
+                
+                # Upload to Vercel Blob
+                filename = f"signatures/{user_id}_{int(now.replace(tzinfo=timezone.utc).timestamp())}.png"
+                signature_url = await storage_service.upload_file(
+                    file_data=signature_bytes,
+                    filename=filename,
+                    content_type="image/png"
+                )
+                
+                if signature_url:
+                    enrollment.signature_url = signature_url
+                    enrollment.signature_created_at = now
+                    db.commit()
+                    return enrollment
+                
+            except Exception:
+                logger.exception(f"Failed to process signature for user {user_id}")
+                return None
+        finally:
+            # Don't orphan the decode when we leave without awaiting it (no
+            # enrollment, or the lookup raised): cancel it if still pending,
+            # otherwise retrieve its outcome so a decode error isn't logged
+            if not decoded.done():
+                decoded.cancel()
+            elif not decoded.cancelled():
+                decoded.exception()
         
         return None
     
@@ -128,7 +169,7 @@ class EnrollmentService:
         self,
         db: Session,
         user_id: str
-    ) -> dict:
+    ) -> EnrollmentStatusResponse:
         """
         Get comprehensive enrollment status for a user.
         
@@ -137,51 +178,48 @@ class EnrollmentService:
             user_id: User ID
             
         Returns:
-            Dictionary with enrollment status details
+            EnrollmentStatusResponse with enrollment status details
         """
-        user = db.query(User).filter(User.id == user_id).first()
+        # The authenticated user is already in the session's identity map,
+        # so this is normally answered without SQL
+        user = db.get(User, user_id)
         if not user:
-            return {
-                "is_enrolled": False,
-                "has_signature": False
-            }
-        
-        enrollment = self.get_enrollment_by_user_id(db, user_id)
+            return EnrollmentStatusResponse(
+                is_enrolled=False,
+                has_signature=False
+            )
         
-        result = {
-            "is_enrolled": user.is_enrolled,
-            "has_signature": False,
-            "enrollment": None,
-            "payment": None
-        }
+        # Enrollment and its payment in one round-trip
+        enrollment, payment = db.query(Enrollment, Payment).outerjoin(
+            Payment, Payment.id == Enrollment.payment_id
+        ).filter(Enrollment.user_id == user_id).first() or (None, None)
         
-        if enrollment:
-            result["has_signature"] = enrollment.signature_url is not None
-            result["enrollment"] = {
-                "id": enrollment.id,
-                "enrolled_at": enrollment.enrolled_at,
-                "completed_at": enrollment.completed_at,
-                "progress_percentage": enrollment.progress_percentage,
-                "last_accessed_at": enrollment.last_accessed_at,
-                "signature_url": enrollment.signature_url,
-                "signature_created_at": enrollment.signature_created_at
-            }
-            
-            # Get payment info if available
-            if enrollment.payment_id:
-                payment = db.query(Payment).filter(
-                    Payment.id == enrollment.payment_id
-                ).first()
-                if payment:
-                    result["payment"] = {
-                        "id": payment.id,
-                        "amount": payment.amount,
-                        "currency": payment.currency,
-                        "status": payment.status,
-                        "created_at": payment.created_at
-                    }
+        if not enrollment:
+            return EnrollmentStatusResponse(
+                is_enrolled=user.is_enrolled,
+                has_signature=False
+            )
         
-        return result
+        return EnrollmentStatusResponse(
+            is_enrolled=user.is_enrolled,
+            has_signature=enrollment.signature_url is not None,
+            enrollment=EnrollmentDetail(
+                id=enrollment.id,
+                enrolled_at=enrollment.enrolled_at,
+                completed_at=enrollment.completed_at,
+                progress_percentage=enrollment.progress_percentage,
+                last_accessed_at=enrollment.last_accessed_at,
+                signature_url=enrollment.signature_url,
+                signature_created_at=enrollment.signature_created_at
+            ),
+            payment=PaymentDetail(
+                id=payment.id,
+                amount=payment.amount,
+                currency=payment.currency,
+                status=payment.status,
+                created_at=payment.created_at
+            ) if payment else None
+        )
 
 
 # Singleton instance
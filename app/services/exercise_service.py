@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional, List
+from sqlalchemy import and_, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Optional, List, Tuple
 from datetime import datetime
+from functools import lru_cache
 import json
 import re
 import uuid
@@ -10,6 +13,107 @@ from app.models.exercise import Exercise
 from app.models.exercise_submission import ExerciseSubmission
 from app.models.user import User
 
+# Dialect-specific INSERT constructs that support ON CONFLICT
+_UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+# Embed code patterns, compiled once at import
+_DOMAIN_RE = re.compile(r'123formbuilder\.com', re.IGNORECASE)
+# (opening tag, matching closing tag) pairs for the accepted embed tags
+_EMBED_TAG_PATTERNS = tuple(
+    (
+        re.compile(rf'<{tag}', re.IGNORECASE),
+        re.compile(rf'</{tag}>', re.IGNORECASE),
+    )
+    for tag in ('iframe', 'script')
+)
+_IFRAME_SRC_RE = re.compile(r'<iframe[^>]*src=["\']([^"\']*123formbuilder\.com[^"\']*)["\']', re.IGNORECASE)
+_SCRIPT_SRC_RE = re.compile(r'<script[^>]*src=["\']([^"\']*123formbuilder\.com[^"\']*)["\']', re.IGNORECASE)
+_DATA_FORM_ID_RE = re.compile(r'data-form-id=["\'](\d+)["\']', re.IGNORECASE)
+
+# Form ID formats found in iframe src URLs, in priority order
+_IFRAME_ID_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'/my-contact-form-(\d+)\.html',  # Matches /my-contact-form-6238706.html
+    r'/form-(\d+)',
+    r'/form/(\d+)',
+    r'[?&]form=(\d+)',
+    r'/my-form/(\d+)',
+))
+
+# Form ID formats found in script src URLs, in priority order
+_SCRIPT_ID_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'/(\d+)\.js',  # Matches /6236478.js format
+    r'/embed/(\d+)',  # Matches /embed/6236478 format
+    r'/form-(\d+)',
+    r'/form/(\d+)',
+    r'[?&]form=(\d+)',
+))
+
+
+def _has_embed_tag(embed_code: str) -> bool:
+    """Check for an iframe or script tag."""
+    # Check for valid HTML structure (iframe or script tag, closed later on
+    # by a tag of the same name)
+    for open_re, close_re in _EMBED_TAG_PATTERNS:
+        tag_match = open_re.search(embed_code)
+        if not tag_match:
+            continue
+        tag_end = embed_code.find('>', tag_match.end())
+        if tag_end != -1 and close_re.search(embed_code, tag_end + 1):
+            return True
+    
+    return False
+
+
+def _find_form_id(embed_code: str) -> Optional[str]:
+    """Pull the form ID out of an iframe src, data-form-id or script src."""
+    # Pattern 1: Look for form ID in iframe src
+    # Example: src="https://www.123formbuilder.com/form-12345/..."
+    iframe_match = _IFRAME_SRC_RE.search(embed_code)
+    
+    if iframe_match:
+        src_url = iframe_match.group(1)
+        for pattern in _IFRAME_ID_PATTERNS:
+            match = pattern.search(src_url)
+            if match:
+                return match.group(1)
+    
+    # Pattern 2: Look for form ID in script tag
+    # Example: data-form-id="12345" or similar
+    script_match = _DATA_FORM_ID_RE.search(embed_code)
+    
+    if script_match:
+        return script_match.group(1)
+    
+    # Pattern 3: Look for form ID in script src URL
+    script_src_match = _SCRIPT_SRC_RE.search(embed_code)
+    
+    if script_src_match:
+        src_url = script_src_match.group(1)
+        for pattern in _SCRIPT_ID_PATTERNS:
+            match = pattern.search(src_url)
+            if match:
+                return match.group(1)
+    
+    return None
+
+
+@lru_cache(maxsize=128)
+def _parse_embed(embed_code: str) -> Tuple[bool, Optional[str]]:
+    """
+    Validate an embed code and extract its form ID in one cached call.
+    
+    Both are pure functions of the embed code, and create/update need both,
+    so admins re-pasting the same form are served from the cache.
+    """
+    # Only 123FormBuilder embeds are valid or have a form ID worth extracting
+    if not _DOMAIN_RE.search(embed_code):
+        return False, None
+    
+    return _has_embed_tag(embed_code), _find_form_id(embed_code)
+
 
 class ExerciseService:
     """Service for managing exercises and submissions."""
@@ -31,15 +135,7 @@ class ExerciseService:
         if not embed_code or not isinstance(embed_code, str):
             return False
         
-        # Check for 123FormBuilder domain
-        if "123formbuilder.com" not in embed_code.lower():
-            return False
-        
-        # Check for valid HTML structure (iframe or script tag)
-        has_iframe = bool(re.search(r'<iframe[^>]*>.*?</iframe>', embed_code, re.IGNORECASE | re.DOTALL))
-        has_script = bool(re.search(r'<script[^>]*>.*?</script>', embed_code, re.IGNORECASE | re.DOTALL))
-        
-        return has_iframe or has_script
+        return _parse_embed(embed_code)[0]
 
     def extract_form_id_from_embed(self, embed_code: str) -> Optional[str]:
         """
@@ -58,63 +154,7 @@ class ExerciseService:
         if not embed_code:
             return None
         
-        # Only extract from 123FormBuilder domains
-        if "123formbuilder.com" not in embed_code.lower():
-            return None
-        
-        # Pattern 1: Look for form ID in iframe src
-        # Example: src="https://www.123formbuilder.com/form-12345/..."
-        iframe_pattern = r'<iframe[^>]*src=["\']([^"\']*123formbuilder\.com[^"\']*)["\']'
-        iframe_match = re.search(iframe_pattern, embed_code, re.IGNORECASE)
-        
-        if iframe_match:
-            src_url = iframe_match.group(1)
-            # Extract form ID from URL patterns like:
-            # - /my-contact-form-6238706.html
-            # - /form-12345/
-            # - /form/12345
-            # - ?form=12345
-            form_id_patterns = [
-                r'/my-contact-form-(\d+)\.html',  # Matches /my-contact-form-6238706.html
-                r'/form-(\d+)',
-                r'/form/(\d+)',
-                r'[?&]form=(\d+)',
-                r'/my-form/(\d+)',
-            ]
-            
-            for pattern in form_id_patterns:
-                match = re.search(pattern, src_url)
-                if match:
-                    return match.group(1)
-        
-        # Pattern 2: Look for form ID in script tag
-        # Example: data-form-id="12345" or similar
-        script_pattern = r'data-form-id=["\'](\d+)["\']'
-        script_match = re.search(script_pattern, embed_code, re.IGNORECASE)
-        
-        if script_match:
-            return script_match.group(1)
-        
-        # Pattern 3: Look for form ID in script src URL
-        script_src_pattern = r'<script[^>]*src=["\']([^"\']*123formbuilder\.com[^"\']*)["\']'
-        script_src_match = re.search(script_src_pattern, embed_code, re.IGNORECASE)
-        
-        if script_src_match:
-            src_url = script_src_match.group(1)
-            form_id_patterns = [
-                r'/(\d+)\.js',  # Matches /6236478.js format
-                r'/embed/(\d+)',  # Matches /embed/6236478 format
-                r'/form-(\d+)',
-                r'/form/(\d+)',
-                r'[?&]form=(\d+)',
-            ]
-            
-            for pattern in form_id_patterns:
-                match = re.search(pattern, src_url)
-                if match:
-                    return match.group(1)
-        
-        return None
+        return _parse_embed(embed_code)[1]
 
     def create_exercise(
         self,
@@ -140,12 +180,11 @@ class ExerciseService:
         Raises:
             ValueError: If embed code is invalid or form ID cannot be extracted
         """
-        # Validate embed code
-        if not self.validate_embed_code(embed_code):
+        # Validate embed code and extract form ID
+        is_valid, form_id = _parse_embed(embed_code) if embed_code else (False, None)
+        if not is_valid:
             raise ValueError("Invalid 123FormBuilder embed code. Please ensure the embed code is from 123FormBuilder.")
         
-        # Extract form ID
-        form_id = self.extract_form_id_from_embed(embed_code)
         if not form_id:
             raise ValueError("Could not extract form ID from embed code. Please ensure you copied the complete embed code.")
         
@@ -163,7 +202,6 @@ class ExerciseService:
         
         db.add(exercise)
         db.commit()
-        db.refresh(exercise)
         
         return exercise
 
@@ -208,16 +246,15 @@ class ExerciseService:
         Raises:
             ValueError: If exercise not found or embed code is invalid
         """
-        exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+        exercise = db.get(Exercise, exercise_id)
         if not exercise:
             raise ValueError(f"Exercise with ID {exercise_id} not found")
         
-        # Validate new embed code
-        if not self.validate_embed_code(embed_code):
+        # Validate new embed code and extract its form ID
+        is_valid, new_form_id = _parse_embed(embed_code) if embed_code else (False, None)
+        if not is_valid:
             raise ValueError("Invalid 123FormBuilder embed code. Please ensure the embed code is from 123FormBuilder.")
         
-        # Extract new form ID
-        new_form_id = self.extract_form_id_from_embed(embed_code)
         if not new_form_id:
             raise ValueError("Could not extract form ID from embed code. Please ensure you copied the complete embed code.")
         
@@ -229,7 +266,6 @@ class ExerciseService:
         exercise.updated_at = datetime.utcnow()
         
         db.commit()
-        db.refresh(exercise)
         
         return exercise
 
@@ -250,7 +286,7 @@ class ExerciseService:
         Returns:
             True if deleted, False if not found
         """
-        exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+        exercise = db.get(Exercise, exercise_id)
         if not exercise:
             return False
         
@@ -285,55 +321,69 @@ class ExerciseService:
         Raises:
             ValueError: If exercise not found or user not found
         """
+        # Exercise, user and any existing submission in one round-trip
+        row = db.query(Exercise, User, ExerciseSubmission).select_from(Exercise).outerjoin(
+            User, User.id == user_id
+        ).outerjoin(
+            ExerciseSubmission, and_(
+                ExerciseSubmission.exercise_id == Exercise.id,
+                ExerciseSubmission.user_id == user_id
+            )
+        ).filter(Exercise.id == exercise_id).first()
+        
         # Verify exercise exists
-        exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
-        if not exercise:
+        if not row:
             raise ValueError(f"Exercise with ID {exercise_id} not found")
         
+        exercise, user, existing_submission = row
+        
         # Verify user exists
-        user = db.query(User).filter(User.id == user_id).first()
         if not user:
             raise ValueError(f"User with ID {user_id} not found")
         
-        # Convert submission data to JSON string
-        submission_json = json.dumps(submission_data)
+        # Single submission per user: keep the first one untouched
+        if existing_submission and not exercise.allow_multiple_submissions:
+            return existing_submission
         
-        # Check if submission already exists
-        existing_submission = db.query(ExerciseSubmission).filter(
-            ExerciseSubmission.exercise_id == exercise_id,
-            ExerciseSubmission.user_id == user_id
-        ).first()
+        # Convert submission data to a compact JSON string (only when writing)
+        submission_json = json.dumps(submission_data, separators=(",", ":"))
         
-        if existing_submission:
-            # Update existing submission if multiple submissions allowed
-            if exercise.allow_multiple_submissions:
-                existing_submission.form_submission_id = form_submission_id
-                existing_submission.submission_data = submission_json
-                existing_submission.submitted_at = submitted_at
-                existing_submission.webhook_received_at = datetime.utcnow()
-                
-                db.commit()
-                db.refresh(existing_submission)
-                
-                return existing_submission
-            else:
-                # Return existing submission without updating
-                return existing_submission
-        
-        # Create new submission
-        submission = ExerciseSubmission(
+        # Insert or update in one statement. ON CONFLICT also covers a
+        # concurrent webhook retry that inserted after the lookup above.
+        now = datetime.utcnow()
+        insert = _UPSERT_INSERTS[db.get_bind().dialect.name]
+        stmt = insert(ExerciseSubmission).values(
             id=str(uuid.uuid4()),
             exercise_id=exercise_id,
             user_id=user_id,
             form_submission_id=form_submission_id,
             submission_data=submission_json,
             submitted_at=submitted_at,
-            webhook_received_at=datetime.utcnow()
+            webhook_received_at=now
         )
-        
-        db.add(submission)
+        conflict_target = [ExerciseSubmission.user_id, ExerciseSubmission.exercise_id]
+        if exercise.allow_multiple_submissions:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_target,
+                set_={
+                    "form_submission_id": form_submission_id,
+                    "submission_data": submission_json,
+                    "submitted_at": submitted_at,
+                    "webhook_received_at": now
+                }
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_target)
+        
+        submission = db.scalars(
+            stmt.returning(ExerciseSubmission),
+            execution_options={"populate_existing": True}
+        ).first()
         db.commit()
-        db.refresh(submission)
+        
+        # Lost a race with another delivery on a single-submission exercise
+        if submission is None:
+            submission = self.get_user_submission(db, exercise_id, user_id)
         
         return submission
 
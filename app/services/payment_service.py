@@ -2,7 +2,11 @@ import hashlib
 import hmac
 import logging
 import json
+import re
 from typing import Optional, Dict, Any
+from urllib.parse import urlencode
+from sqlalchemy import func, literal, literal_column, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 
@@ -12,6 +16,15 @@ from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+# Strips formatting (spaces, dashes, "+", brackets) from phone numbers
+_NON_DIGIT_RE = re.compile(r"\D+")
+
+# Order in which iPay concatenates fields into the HMAC datastring
+_IPAY_FIELD_ORDER = (
+    "live", "oid", "inv", "ttl", "tel", "eml", "vid", "curr",
+    "p1", "p2", "p3", "p4", "cbk", "cst", "crl",
+)
+
 
 class PaymentService:
     """Service for handling payment processing with iPay Africa."""
@@ -21,6 +34,23 @@ class PaymentService:
         self.secret_key = settings.ipay_secret_key
         self.base_url = "https://payments.ipayafrica.com/v3/ke"
         self.callback_url = f"{settings.backend_url}/api/enrollment/callback"
+        
+        # Checkout fields that are fixed for the process lifetime, with their
+        # query-string form encoded once
+        is_demo = self.vendor_id == "demo"
+        self._static_fields = {
+            "live": "0" if is_demo else "1",
+            "vid": "demo" if is_demo else self.vendor_id,
+            "cbk": self.callback_url,
+            "cst": "1",
+            "crl": "2"  # As per PHP example
+        }
+        self._static_query = urlencode(self._static_fields)
+        
+        # HMAC keyed once with the mode's secret; each signature copies it
+        # instead of re-deriving the key pads
+        hash_key = "demoCHANGED" if is_demo else self.secret_key
+        self._hmac_template = hmac.new(hash_key.encode('utf-8'), digestmod=hashlib.sha1)
     
     def create_payment_record(
         self,
@@ -38,82 +68,48 @@ class PaymentService:
             currency=currency,
             status=PaymentStatus.PENDING.value,
             expires_at=expires_at,
-            webhook_attempts="0"
+            webhook_attempts=0
         )
         db.add(payment)
         db.commit()
-        db.refresh(payment)
         return payment
     
     def generate_payment_url(self, payment: Payment, user: User) -> str:
         """Generate iPay Africa payment URL based on official PHP implementation."""
         
-        # Determine mode
-        is_demo = self.vendor_id == "demo"
-        live_mode = "0" if is_demo else "1"
-        vendor_id = "demo" if is_demo else self.vendor_id
-        hash_key = "demoCHANGED" if is_demo else self.secret_key
-        
         # Format phone number (remove non-digits, ensure 254 prefix)
-        phone = user.phone_number or ""
-        phone = ''.join(filter(str.isdigit, phone))
+        phone = _NON_DIGIT_RE.sub("", user.phone_number or "")
         if phone.startswith("0"):
             phone = "254" + phone[1:]
         elif not phone.startswith("254"):
             phone = "254" + phone if phone else ""
         
-        # Build fields exactly as in PHP example
+        # Per-payment fields; the rest of the PHP example's fields are static
+        payment_id = str(payment.id)
         fields = {
-            "live": live_mode,
-            "oid": str(payment.id),
-            "inv": str(payment.id),
+            "oid": payment_id,
+            "inv": payment_id,
             "ttl": str(int(payment.amount)),
             "tel": phone,
             "eml": user.email,
-            "vid": vendor_id,
             "curr": payment.currency,
-            "p1": str(payment.id),
+            "p1": payment_id,
             "p2": str(user.id),
             "p3": "",
-            "p4": "",
-            "cbk": self.callback_url,
-            "cst": "1",
-            "crl": "2"  # As per PHP example
+            "p4": ""
         }
         
         # Generate datastring - exact order as PHP
-        datastring = (
-            fields['live'] +
-            fields['oid'] +
-            fields['inv'] +
-            fields['ttl'] +
-            fields['tel'] +
-            fields['eml'] +
-            fields['vid'] +
-            fields['curr'] +
-            fields['p1'] +
-            fields['p2'] +
-            fields['p3'] +
-            fields['p4'] +
-            fields['cbk'] +
-            fields['cst'] +
-            fields['crl']
-        )
+        all_fields = {**self._static_fields, **fields}
+        datastring = ''.join([all_fields[k] for k in _IPAY_FIELD_ORDER])
         
         # Generate hash using HMAC-SHA1 (same as PHP hash_hmac)
-        generated_hash = hmac.new(
-            hash_key.encode('utf-8'),
-            datastring.encode('utf-8'),
-            hashlib.sha1
-        ).hexdigest()
-        
-        fields["hsh"] = generated_hash
+        fields["hsh"] = self._sign(datastring)
         
         logger.info(f"Payment URL generated for {payment.id}, amount: {fields['ttl']}")
         
-        # Build URL
-        query_string = "&".join([f"{k}={v}" for k, v in fields.items()])
-        return f"{self.base_url}?{query_string}"
+        # Build URL (values such as emails and the callback URL need escaping)
+        return f"{self.base_url}?{self._static_query}&{urlencode(fields)}"
     
     def verify_callback_signature(self, callback_data: Dict[str, Any]) -> bool:
         """Verify iPay callback signature."""
@@ -128,34 +124,23 @@ class PaymentService:
         if not received_hash:
             return False
         
-        hash_key = self.secret_key
-        
         # Reconstruct datastring
-        datastring = (
-            str(callback_data.get('live', '')) +
-            str(callback_data.get('oid', '')) +
-            str(callback_data.get('inv', '')) +
-            str(callback_data.get('ttl', '')) +
-            str(callback_data.get('tel', '')) +
-            str(callback_data.get('eml', '')) +
-            str(callback_data.get('vid', '')) +
-            str(callback_data.get('curr', '')) +
-            str(callback_data.get('p1', '')) +
-            str(callback_data.get('p2', '')) +
-            str(callback_data.get('p3', '')) +
-            str(callback_data.get('p4', '')) +
-            str(callback_data.get('cbk', '')) +
-            str(callback_data.get('cst', '')) +
-            str(callback_data.get('crl', ''))
-        )
+        datastring = ''.join([str(callback_data.get(k, '')) for k in _IPAY_FIELD_ORDER])
         
-        computed_hash = hmac.new(
-            hash_key.encode('utf-8'),
-            datastring.encode('utf-8'),
-            hashlib.sha1
-        ).hexdigest()
+        computed_hash = self._sign(datastring)
         
-        return received_hash.lower() == computed_hash.lower()
+        # hexdigest() is already lowercase; compare bytes in constant time so
+        # non-ASCII input is rejected rather than raising
+        return hmac.compare_digest(
+            received_hash.lower().encode('utf-8'),
+            computed_hash.encode('ascii')
+        )
+    
+    def _sign(self, datastring: str) -> str:
+        """Return the hex HMAC-SHA1 of an iPay datastring."""
+        mac = self._hmac_template.copy()
+        mac.update(datastring.encode('utf-8'))
+        return mac.hexdigest()
     
     def update_payment_status(
         self,
@@ -165,10 +150,10 @@ class PaymentService:
         ipay_transaction_id: Optional[str] = None,
         ipay_reference: Optional[str] = None,
         payment_method: Optional[str] = None,
-        metadata: Optional[str] = None
+        metadata: Optional[Dict[str, Any]] = None
     ) -> Optional[Payment]:
         """Update payment status."""
-        payment = db.query(Payment).filter(Payment.id == payment_id).first()
+        payment = db.get(Payment, payment_id)
         if not payment:
             return None
         
@@ -184,34 +169,37 @@ class PaymentService:
         
         payment.updated_at = datetime.utcnow()
         db.commit()
-        db.refresh(payment)
         return payment
     
     def get_payment_by_id(self, db: Session, payment_id: str) -> Optional[Payment]:
         """Get payment by ID."""
-        return db.query(Payment).filter(Payment.id == payment_id).first()
+        return db.get(Payment, payment_id)
     
     def increment_webhook_attempts(self, db: Session, payment_id: str) -> None:
         """Increment webhook retry attempts counter."""
         if not payment_id:
             return
         
-        payment = self.get_payment_by_id(db, payment_id)
-        if payment:
-            try:
-                attempts = int(payment.webhook_attempts or "0")
-                payment.webhook_attempts = str(attempts + 1)
-                db.commit()
-                logger.info(f"Webhook attempt {payment.webhook_attempts} for payment {payment_id}")
-            except Exception as e:
-                logger.error(f"Failed to increment webhook attempts: {e}")
-                db.rollback()
+        try:
+            # Atomic in-database increment, safe under concurrent redelivery
+            attempts = db.execute(
+                update(Payment)
+                .where(Payment.id == payment_id)
+                .values(webhook_attempts=Payment.webhook_attempts + 1)
+                .returning(Payment.webhook_attempts)
+            ).scalar()
+            db.commit()
+            if attempts is not None:
+                logger.info(f"Webhook attempt {attempts} for payment {payment_id}")
+        except Exception as e:
+            logger.error(f"Failed to increment webhook attempts: {e}")
+            db.rollback()
     
     def get_failed_webhooks(self, db: Session, max_attempts: int = 5) -> list[Payment]:
         """Get payments with failed webhooks that can be retried."""
         return db.query(Payment).filter(
             Payment.status == PaymentStatus.PENDING.value,
-            Payment.webhook_attempts.cast(db.Integer) < max_attempts,
+            Payment.webhook_attempts < max_attempts,
             Payment.expires_at > datetime.utcnow()
         ).all()
     
@@ -225,15 +213,15 @@ class PaymentService:
             return False
         
         try:
-            attempts = int(payment.webhook_attempts or "0")
+            attempts = payment.webhook_attempts or 0
             if attempts >= 5:
                 logger.warning(f"Payment {payment_id} exceeded max webhook attempts")
                 # Mark as failed after max attempts
                 payment.status = PaymentStatus.FAILED.value
-                payment.payment_metadata = json.dumps({
+                payment.payment_metadata = {
                     "error": "Max webhook retry attempts exceeded",
                     "attempts": attempts
-                })
+                }
                 db.commit()
                 return False
             
@@ -250,20 +238,27 @@ class PaymentService:
             Number of payments expired
         """
         try:
-            # Find all pending payments that have expired
-            expired_payments = db.query(Payment).filter(
-                Payment.status == PaymentStatus.PENDING.value,
-                Payment.expires_at < datetime.utcnow()
-            ).all()
+            now = datetime.utcnow()
+            expiry_note = {
+                "expired_at": now.isoformat(),
+                "reason": "Payment expired (30 minutes timeout)"
+            }
             
-            count = 0
-            for payment in expired_payments:
-                payment.status = PaymentStatus.FAILED.value
-                payment_metadata = json.loads(payment.payment_metadata) if payment.payment_metadata else {}
-                payment_metadata['expired_at'] = datetime.utcnow().isoformat()
-                payment_metadata['reason'] = 'Payment expired (30 minutes timeout)'
-                payment.payment_metadata = json.dumps(payment_metadata)
-                count += 1
+            # Fail every expired pending payment in one statement, merging
+            # the expiry note into any existing metadata in the database
+            result = db.execute(
+                update(Payment)
+                .where(
+                    Payment.status == PaymentStatus.PENDING.value,
+                    Payment.expires_at < now
+                )
+                .values(
+                    status=PaymentStatus.FAILED.value,
+                    payment_metadata=self._merge_metadata(db, expiry_note)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            count = result.rowcount
             
             if count > 0:
                 db.commit()
@@ -274,6 +269,14 @@ class PaymentService:
             logger.error(f"Error expiring old payments: {e}", exc_info=True)
             db.rollback()
             return 0
+    
+    def _merge_metadata(self, db: Session, extra: Dict[str, Any]):
+        """SQL expression merging a JSON object into payment_metadata."""
+        if db.get_bind().dialect.name == "postgresql":
+            existing = func.coalesce(Payment.payment_metadata, literal_column("'{}'::jsonb"))
+            return existing.op("||")(literal(extra, JSONB))
+        existing = func.coalesce(Payment.payment_metadata, literal_column("'{}'"))
+        return func.json_patch(existing, json.dumps(extra, separators=(",", ":")))
 
 
 # Singleton instance
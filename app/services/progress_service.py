@@ -8,12 +8,13 @@ This service provides robust progress tracking with:
 - Accurate progress calculations
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func, case, and_
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import event, exists, func, case, and_, or_, cast, column, lambda_stmt, select, update, values, DateTime, Integer, Numeric, String
 from typing import Optional, List, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 
+from app.database import SessionLocal
 from app.models.user_progress import UserProgress
 from app.models.enrollment import Enrollment
 from app.models.content import Content
@@ -27,6 +28,45 @@ from app.schemas.progress import (
     CompletedContentBreakdown
 )
 
+# Content type -> ContentBreakdown / CompletedContentBreakdown field
+_BREAKDOWN_FIELDS = {
+    'video': 'videos',
+    'pdf': 'pdfs',
+    'rich_text': 'rich_text',
+    'exercise': 'exercises',
+}
+
+# Exact Decimal percentages, so enrollments are compared and stored without
+# going through float or str
+_ZERO_PERCENT = Decimal("0.00")
+_PROGRESS_TOLERANCE = Decimal("0.01")
+
+# Minimum age of user_progress.updated_at before a replayed update (same
+# completion state) writes a fresh access time
+PROGRESS_TOUCH_INTERVAL = timedelta(minutes=5)
+
+# Rows per UPDATE ... FROM (VALUES ...) statement when writing back enrollments
+ENROLLMENT_WRITEBACK_BATCH_SIZE = 1000
+
+# Enrollments fetched per round-trip (and changes buffered before each
+# write-back) when recalculating every enrollment
+ENROLLMENT_STREAM_BATCH_SIZE = 500
+
+# Session.info key for published content totals memoized for the lifetime of
+# a session (one request). Totals are not shared across requests because
+# serverless instances could not invalidate each other's copies.
+_TOTALS_CACHE_KEY = "progress_published_totals"
+
+@event.listens_for(SessionLocal, "after_flush")
+def _invalidate_progress_caches(session, flush_context):
+    """Drop memoized totals once content or modules change."""
+    if _TOTALS_CACHE_KEY not in session.info:
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Content, Module)):
+            session.info.pop(_TOTALS_CACHE_KEY, None)
+            return
+
 
 class ProgressService:
     """
@@ -52,7 +92,7 @@ class ProgressService:
         This method:
         1. Creates or updates the progress record
         2. Recalculates enrollment progress
-        3. Uses a transaction to ensure consistency
+        3. Commits both in a single transaction
         
         Args:
             db: Database session
@@ -68,7 +108,7 @@ class ProgressService:
         """
         try:
             # Verify content exists and is published
-            content = db.query(Content).filter(
+            content = db.query(Content.id).filter(
                 Content.id == content_id,
                 Content.is_published == True
             ).first()
@@ -82,6 +122,18 @@ class ProgressService:
                 UserProgress.content_id == content_id
             ).first()
 
+            # Replay of the current completion state: skip the counter and
+            # enrollment recalculation, and only record the access time (it
+            # drives "last accessed content") once per PROGRESS_TOUCH_INTERVAL
+            if progress and progress.is_completed == progress_data.is_completed:
+                now = datetime.utcnow()
+                if now - progress.updated_at >= PROGRESS_TOUCH_INTERVAL:
+                    progress.updated_at = now
+                    db.commit()
+                return progress
+
+            was_completed = progress.is_completed if progress else False
+
             if progress:
                 # Update existing progress
                 progress.is_completed = progress_data.is_completed
@@ -102,15 +154,23 @@ class ProgressService:
                 )
                 db.add(progress)
 
-            # Commit progress update
-            db.commit()
-            db.refresh(progress)
+            # Keep the enrollment's completed count in step, in the same
+            # transaction as the progress row
+            delta = int(progress_data.is_completed) - int(was_completed)
+            if delta:
+                db.query(Enrollment).filter(
+                    Enrollment.user_id == user_id
+                ).update({
+                    Enrollment.completed_content_count: Enrollment.completed_content_count + delta
+                })
+
+            # Recalculate enrollment progress whenever the completed count
+            # moved, in either direction. With the counter and the memoized
+            # total this needs no COUNT query.
+            self.recalculate_enrollment_progress(db, user_id, delta, commit=False)
 
-            # Recalculate enrollment progress on completion
-            # For partial updates, we skip recalculation to improve performance
-            # The enrollment progress is primarily based on completed content
-            if progress_data.is_completed:
-                self.recalculate_enrollment_progress(db, user_id)
+            # Progress row, counter and percentage go out in one commit
+            db.commit()
 
             return progress
             
@@ -136,16 +196,45 @@ class ProgressService:
         Returns:
             OverallProgressResponse with complete progress data
         """
-        # Get enrollment
-        enrollment = db.query(Enrollment).filter(
+        # Most recently touched content in the enrollment's last accessed
+        # module, resolved inside the enrollment lookup
+        touched = aliased(Content)
+        last_content_id = (
+            select(UserProgress.content_id)
+            .join(touched, UserProgress.content_id == touched.id)
+            .where(
+                UserProgress.user_id == Enrollment.user_id,
+                touched.module_id == Enrollment.last_accessed_module_id
+            )
+            .order_by(UserProgress.updated_at.desc())
+            .limit(1)
+            .correlate(Enrollment)
+            .scalar_subquery()
+        )
+
+        # Enrollment and its last accessed content in one round-trip
+        enrollment = db.query(
+            Enrollment.last_accessed_module_id,
+            Enrollment.last_accessed_at,
+            Content.id.label('content_id'),
+            Content.module_id,
+            Content.title,
+            Content.content_type
+        ).outerjoin(
+            Content, Content.id == last_content_id
+        ).filter(
             Enrollment.user_id == user_id
         ).first()
 
-        # Query for all modules with their content progress in a single query
-        # This uses LEFT JOINs to include modules even if they have no content
-        modules_with_progress = (
+        # One grouped query yields per-module totals and the per-type
+        # breakdowns. Unpublished modules are kept so their published
+        # content still counts towards the breakdowns, as before.
+        module_type_rows = (
             db.query(
-                Module,
+                Module.id,
+                Module.title,
+                Module.is_published,
+                Content.content_type,
                 func.count(Content.id).label('content_count'),
                 func.sum(
                     case(
@@ -168,22 +257,35 @@ class ProgressService:
                     UserProgress.user_id == user_id
                 )
             )
-            .filter(Module.is_published == True)
-            .group_by(Module.id)
+            .group_by(Module.id, Module.title, Module.is_published, Module.order_index, Content.content_type)
             .order_by(Module.order_index)
             .all()
         )
 
+        content_counts = dict.fromkeys(_BREAKDOWN_FIELDS.values(), 0)
+        completed_counts = dict.fromkeys(_BREAKDOWN_FIELDS.values(), 0)
+        module_totals = {}
+
+        for module_id, module_title, module_published, content_type, type_total, type_completed in module_type_rows:
+            type_completed = type_completed or 0
+
+            field = _BREAKDOWN_FIELDS.get(content_type)
+            if field:
+                content_counts[field] += type_total
+                completed_counts[field] += type_completed
+
+            if module_published:
+                totals = module_totals.setdefault(module_id, [module_title, 0, 0])
+                totals[1] += type_total
+                totals[2] += type_completed
+
         # Build module progress list
         module_progress_list = []
         total_content = 0
         completed_content = 0
         completed_modules = 0
 
-        for module, module_total, module_completed in modules_with_progress:
-            module_total = module_total or 0
-            module_completed = module_completed or 0
-            
+        for module_id, (module_title, module_total, module_completed) in module_totals.items():
             total_content += module_total
             completed_content += module_completed
 
@@ -197,82 +299,31 @@ class ProgressService:
 
             module_progress_list.append(
                 ModuleProgressResponse(
-                    module_id=module.id,
-                    module_title=module.title,
+                    module_id=module_id,
+                    module_title=module_title,
                     total_content=module_total,
                     completed_content=module_completed,
                     progress_percentage=round(module_progress_pct, 2)
                 )
             )
 
+        content_breakdown = ContentBreakdown(**content_counts)
+        completed_breakdown = CompletedContentBreakdown(**completed_counts)
+
         # Calculate overall progress
         overall_progress = (
             (completed_content / total_content * 100) if total_content > 0 else 0
         )
 
-        # Get content breakdown by type
-        content_breakdown_query = db.query(
-            Content.content_type,
-            func.count(Content.id).label('count')
-        ).filter(
-            Content.is_published == True
-        ).group_by(Content.content_type).all()
-        
-        content_breakdown = ContentBreakdown()
-        for content_type, count in content_breakdown_query:
-            if content_type == 'video':
-                content_breakdown.videos = count
-            elif content_type == 'pdf':
-                content_breakdown.pdfs = count
-            elif content_type == 'rich_text':
-                content_breakdown.rich_text = count
-            elif content_type == 'exercise':
-                content_breakdown.exercises = count
-        
-        # Get completed content breakdown by type
-        completed_breakdown_query = db.query(
-            Content.content_type,
-            func.count(UserProgress.id).label('count')
-        ).join(
-            UserProgress, UserProgress.content_id == Content.id
-        ).filter(
-            UserProgress.user_id == user_id,
-            UserProgress.is_completed == True,
-            Content.is_published == True
-        ).group_by(Content.content_type).all()
-        
-        completed_breakdown = CompletedContentBreakdown()
-        for content_type, count in completed_breakdown_query:
-            if content_type == 'video':
-                completed_breakdown.videos = count
-            elif content_type == 'pdf':
-                completed_breakdown.pdfs = count
-            elif content_type == 'rich_text':
-                completed_breakdown.rich_text = count
-            elif content_type == 'exercise':
-                completed_breakdown.exercises = count
-
         # Get last accessed content details
         last_accessed_content = None
-        if enrollment and enrollment.last_accessed_module_id:
-            last_progress = db.query(UserProgress).join(
-                Content, UserProgress.content_id == Content.id
-            ).filter(
-                UserProgress.user_id == user_id,
-                Content.module_id == enrollment.last_accessed_module_id
-            ).order_by(UserProgress.updated_at.desc()).first()
-            
-            if last_progress:
-                content = db.query(Content).filter(
-                    Content.id == last_progress.content_id
-                ).first()
-                if content:
-                    last_accessed_content = {
-                        "id": content.id,
-                        "module_id": content.module_id,
-                        "title": content.title,
-                        "content_type": content.content_type
-                    }
+        if enrollment and enrollment.content_id:
+            last_accessed_content = {
+                "id": enrollment.content_id,
+                "module_id": enrollment.module_id,
+                "title": enrollment.title,
+                "content_type": enrollment.content_type
+            }
 
         return OverallProgressResponse(
             progress_percentage=round(overall_progress, 2),
@@ -308,9 +359,20 @@ class ProgressService:
         Returns:
             List of ContentProgressResponse objects ordered by content order_index
         """
-        # Single query to get all content with their progress
+        # Single query to get all content with their progress, selecting
+        # only the columns in the response
         content_with_progress = (
-            db.query(Content, UserProgress)
+            db.query(
+                Content.id,
+                Content.title,
+                Content.content_type,
+                UserProgress.id.label('progress_id'),
+                UserProgress.is_completed,
+                UserProgress.time_spent,
+                UserProgress.last_position,
+                UserProgress.completed_at,
+                UserProgress.updated_at
+            )
             .outerjoin(
                 UserProgress,
                 and_(
@@ -326,33 +388,35 @@ class ProgressService:
             .all()
         )
 
+        # Placeholder timestamp shared by every item without progress
+        now = datetime.utcnow()
         progress_list = []
-        for content, progress in content_with_progress:
-            if progress:
+        for row in content_with_progress:
+            if row.progress_id:
                 progress_list.append(
                     ContentProgressResponse(
-                        content_id=content.id,
-                        content_title=content.title,
-                        content_type=content.content_type,
-                        is_completed=progress.is_completed,
-                        time_spent=progress.time_spent,
-                        last_position=progress.last_position,
-                        completed_at=progress.completed_at,
-                        updated_at=progress.updated_at
+                        content_id=row.id,
+                        content_title=row.title,
+                        content_type=row.content_type,
+                        is_completed=row.is_completed,
+                        time_spent=row.time_spent,
+                        last_position=row.last_position,
+                        completed_at=row.completed_at,
+                        updated_at=row.updated_at
                     )
                 )
             else:
                 # No progress record exists yet
                 progress_list.append(
                     ContentProgressResponse(
-                        content_id=content.id,
-                        content_title=content.title,
-                        content_type=content.content_type,
+                        content_id=row.id,
+                        content_title=row.title,
+                        content_type=row.content_type,
                         is_completed=False,
                         time_spent=0,
                         last_position=None,
                         completed_at=None,
-                        updated_at=datetime.utcnow()
+                        updated_at=now
                     )
                 )
 
@@ -375,9 +439,19 @@ class ProgressService:
         Returns:
             ContentProgressResponse or None if content doesn't exist
         """
-        # Single query with join
-        result = (
-            db.query(Content, UserProgress)
+        # Single query with join, selecting only the columns in the response
+        row = (
+            db.query(
+                Content.id,
+                Content.title,
+                Content.content_type,
+                UserProgress.id.label('progress_id'),
+                UserProgress.is_completed,
+                UserProgress.time_spent,
+                UserProgress.last_position,
+                UserProgress.completed_at,
+                UserProgress.updated_at
+            )
             .outerjoin(
                 UserProgress,
                 and_(
@@ -389,28 +463,26 @@ class ProgressService:
             .first()
         )
 
-        if not result:
+        if not row:
             return None
 
-        content, progress = result
-
-        if progress:
+        if row.progress_id:
             return ContentProgressResponse(
-                content_id=content.id,
-                content_title=content.title,
-                content_type=content.content_type,
-                is_completed=progress.is_completed,
-                time_spent=progress.time_spent,
-                last_position=progress.last_position,
-                completed_at=progress.completed_at,
-                updated_at=progress.updated_at
+                content_id=row.id,
+                content_title=row.title,
+                content_type=row.content_type,
+                is_completed=row.is_completed,
+                time_spent=row.time_spent,
+                last_position=row.last_position,
+                completed_at=row.completed_at,
+                updated_at=row.updated_at
             )
         else:
             # No progress record exists yet
             return ContentProgressResponse(
-                content_id=content.id,
-                content_title=content.title,
-                content_type=content.content_type,
+                content_id=row.id,
+                content_title=row.title,
+                content_type=row.content_type,
                 is_completed=False,
                 time_spent=0,
                 last_position=None,
@@ -442,10 +514,113 @@ class ProgressService:
         Returns:
             Tuple of (can_access: bool, reason_if_blocked: Optional[str])
         """
-        # Get the requested content with its module in a single query
+        return self._evaluate_access(db, user_id, content_id)
+
+    def _evaluate_access(
+        self,
+        db: Session,
+        user_id: str,
+        content_id: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Apply the sequential access rules of can_access_content against the database.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            content_id: Content ID to check access for
+            
+        Returns:
+            Tuple of (can_access: bool, reason_if_blocked: Optional[str])
+        """
+        # Everything the rules below need, fetched in one query. Content and
+        # modules are unique per (parent, order_index), so the "previous"
+        # joins match at most one row each.
+        first_module = aliased(Module)
+        previous_content = aliased(Content)
+        previous_progress = aliased(UserProgress)
+        previous_module = aliased(Module)
+        last_content = aliased(Content)
+        last_progress = aliased(UserProgress)
+
+        is_completed_by_user = exists().where(
+            UserProgress.user_id == user_id,
+            UserProgress.content_id == Content.id,
+            UserProgress.is_completed == True
+        )
+        first_module_id_query = (
+            select(first_module.id)
+            .where(
+                first_module.course_id == Module.course_id,
+                first_module.is_published == True
+            )
+            .order_by(first_module.order_index)
+            .limit(1)
+            .scalar_subquery()
+        )
+        last_content_id_query = (
+            select(Content.id)
+            .where(
+                Content.module_id == previous_module.id,
+                Content.is_published == True
+            )
+            .order_by(Content.order_index.desc())
+            .limit(1)
+            .correlate(previous_module)
+            .scalar_subquery()
+        )
+
         result = (
-            db.query(Content, Module)
+            db.query(
+                Content.is_published,
+                Content.order_index,
+                Module.id,
+                Module.is_published,
+                Module.order_index,
+                is_completed_by_user,
+                first_module_id_query,
+                previous_content.id,
+                previous_content.title,
+                previous_progress.id,
+                previous_module.id,
+                previous_module.title,
+                last_content.id,
+                last_progress.id
+            )
             .join(Module, Content.module_id == Module.id)
+            .outerjoin(
+                previous_content,
+                and_(
+                    previous_content.module_id == Content.module_id,
+                    previous_content.order_index == Content.order_index - 1,
+                    previous_content.is_published == True
+                )
+            )
+            .outerjoin(
+                previous_progress,
+                and_(
+                    previous_progress.content_id == previous_content.id,
+                    previous_progress.user_id == user_id,
+                    previous_progress.is_completed == True
+                )
+            )
+            .outerjoin(
+                previous_module,
+                and_(
+                    previous_module.course_id == Module.course_id,
+                    previous_module.order_index == Module.order_index - 1,
+                    previous_module.is_published == True
+                )
+            )
+            .outerjoin(last_content, last_content.id == last_content_id_query)
+            .outerjoin(
+                last_progress,
+                and_(
+                    last_progress.content_id == last_content.id,
+                    last_progress.user_id == user_id,
+                    last_progress.is_completed == True
+                )
+            )
             .filter(Content.id == content_id)
             .first()
         )
@@ -453,54 +628,36 @@ class ProgressService:
         if not result:
             return False, "Content not found"
         
-        content, module = result
+        (
+            content_published, content_order, module_id, module_published,
+            module_order, already_completed, first_module_id,
+            previous_content_id, previous_content_title, previous_progress_id,
+            previous_module_id, previous_module_title,
+            last_content_id, last_progress_id
+        ) = result
         
         # Check if content is published
-        if not content.is_published:
+        if not content_published:
             return False, "Content is not published"
         
         # Check if module is published
-        if not module.is_published:
+        if not module_published:
             return False, "Module is not published"
         
         # Rule 5: Already completed content is always accessible (for review)
-        existing_progress = db.query(UserProgress).filter(
-            UserProgress.user_id == user_id,
-            UserProgress.content_id == content_id,
-            UserProgress.is_completed == True
-        ).first()
-        
-        if existing_progress:
+        if already_completed:
             return True, None
         
         # Rule 1: First content in first module is always accessible
-        first_module = db.query(Module).filter(
-            Module.course_id == module.course_id,
-            Module.is_published == True
-        ).order_by(Module.order_index).first()
-        
-        if first_module and module.id == first_module.id and content.order_index == 0:
+        if module_id == first_module_id and content_order == 0:
             return True, None
         
         # Rule 2 & 3: Check if there's a previous content in the same module
-        if content.order_index > 0:
-            # Get previous content in the same module
-            previous_content = db.query(Content).filter(
-                Content.module_id == content.module_id,
-                Content.order_index == content.order_index - 1,
-                Content.is_published == True
-            ).first()
-            
-            if previous_content:
+        if content_order > 0:
+            if previous_content_id:
                 # Check if previous content is completed
-                previous_progress = db.query(UserProgress).filter(
-                    UserProgress.user_id == user_id,
-                    UserProgress.content_id == previous_content.id,
-                    UserProgress.is_completed == True
-                ).first()
-                
-                if not previous_progress:
-                    return False, f"You must complete '{previous_content.title}' first"
+                if not previous_progress_id:
+                    return False, f"You must complete '{previous_content_title}' first"
                 
                 return True, None
             else:
@@ -510,30 +667,12 @@ class ProgressService:
         
         # Rule 4: This is the first content in a module (but not the first module)
         # Check if the previous module is completed
-        if module.order_index > 0:
-            previous_module = db.query(Module).filter(
-                Module.course_id == module.course_id,
-                Module.order_index == module.order_index - 1,
-                Module.is_published == True
-            ).first()
-            
-            if previous_module:
-                # Get the last content of the previous module
-                last_content_of_previous_module = db.query(Content).filter(
-                    Content.module_id == previous_module.id,
-                    Content.is_published == True
-                ).order_by(Content.order_index.desc()).first()
-                
-                if last_content_of_previous_module:
-                    # Check if it's completed
-                    last_content_progress = db.query(UserProgress).filter(
-                        UserProgress.user_id == user_id,
-                        UserProgress.content_id == last_content_of_previous_module.id,
-                        UserProgress.is_completed == True
-                    ).first()
-                    
-                    if not last_content_progress:
-                        return False, f"You must complete the previous module '{previous_module.title}' first"
+        if module_order > 0:
+            if previous_module_id:
+                if last_content_id:
+                    # Check if the last content of the previous module is completed
+                    if not last_progress_id:
+                        return False, f"You must complete the previous module '{previous_module_title}' first"
                 else:
                     # Previous module has no published content, allow access
                     return True, None
@@ -548,7 +687,7 @@ class ProgressService:
         self,
         completed_count: int,
         total_count: int
-    ) -> float:
+    ) -> Decimal:
         """
         Calculate progress percentage from completed and total counts.
         
@@ -557,13 +696,17 @@ class ProgressService:
             total_count: Total number of items
             
         Returns:
-            Progress percentage rounded to 2 decimal places (0.00 to 100.00)
+            Progress percentage rounded half-to-even to 2 decimal places
+            (0.00 to 100.00), computed in integer hundredths of a percent
         """
         if total_count == 0:
-            return 0.0
+            return _ZERO_PERCENT
         
-        percentage = (completed_count / total_count) * 100
-        return round(percentage, 2)
+        hundredths, remainder = divmod(completed_count * 10000, total_count)
+        twice_remainder = remainder * 2
+        if twice_remainder > total_count or (twice_remainder == total_count and hundredths % 2):
+            hundredths += 1
+        return Decimal(hundredths).scaleb(-2)
 
     def update_last_accessed(
         self,
@@ -582,13 +725,15 @@ class ProgressService:
             module_id: Module ID that was accessed
         """
         try:
-            enrollment = db.query(Enrollment).filter(
+            # Single UPDATE; a user without an enrollment matches no rows
+            updated = db.query(Enrollment).filter(
                 Enrollment.user_id == user_id
-            ).first()
+            ).update({
+                Enrollment.last_accessed_module_id: module_id,
+                Enrollment.last_accessed_at: datetime.utcnow()
+            })
 
-            if enrollment:
-                enrollment.last_accessed_module_id = module_id
-                enrollment.last_accessed_at = datetime.utcnow()
+            if updated:
                 db.commit()
                 
         except Exception as e:
@@ -598,14 +743,16 @@ class ProgressService:
     def recalculate_enrollment_progress(
         self,
         db: Session,
-        user_id: str
+        user_id: str,
+        delta: Optional[int] = None,
+        commit: bool = True
     ) -> None:
         """
         Recalculate and update enrollment progress percentage.
         
         This method:
         1. Counts total published content
-        2. Counts completed content for the user
+        2. Reads the enrollment's completed content count
         3. Calculates progress percentage
         4. Updates enrollment record
         5. Uses a transaction to ensure consistency
@@ -613,7 +760,15 @@ class ProgressService:
         Args:
             db: Database session
             user_id: User ID
+            delta: Change in the user's completed count that triggered this
+                call; 0 means nothing changed and the call is skipped.
+                None always recalculates.
+            commit: Commit the update. update_progress passes False so the
+                enrollment goes out in the same commit as the progress row.
         """
+        if delta == 0:
+            return
+
         try:
             # Get enrollment
             enrollment = db.query(Enrollment).filter(
@@ -624,32 +779,20 @@ class ProgressService:
                 return
 
             # Get total published content count
-            total_content = db.query(func.count(Content.id)).filter(
-                Content.is_published == True
-            ).scalar()
+            total_content = self._get_total_published_content(db)
 
             if total_content == 0:
                 return
 
-            # Get completed content count for this user
-            completed_content = db.query(func.count(UserProgress.id)).join(
-                Content, UserProgress.content_id == Content.id
-            ).filter(
-                UserProgress.user_id == user_id,
-                UserProgress.is_completed == True,
-                Content.is_published == True
-            ).scalar()
-
-            # Calculate progress percentage
-            progress_percentage = self.calculate_progress_percentage(
-                completed_content, total_content
+            # Completed content count is maintained by update_progress and
+            # resynced by recalculate_all_enrollments
+            enrollment.progress_percentage = self.calculate_progress_percentage(
+                enrollment.completed_content_count, total_content
             )
-
-            # Update enrollment
-            enrollment.progress_percentage = Decimal(str(progress_percentage))
             enrollment.last_accessed_at = datetime.utcnow()
 
-            db.commit()
+            if commit:
+                db.commit()
             
         except Exception as e:
             db.rollback()
@@ -670,24 +813,9 @@ class ProgressService:
         Returns:
             True if all published content is completed, False otherwise
         """
-        # Get total published content count
-        total_content = db.query(func.count(Content.id)).filter(
-            Content.is_published == True
-        ).scalar()
+        total_content, completed_content = self._get_completion_counts(db, user_id)
 
-        if total_content == 0:
-            return False
-
-        # Get completed content count for this user
-        completed_content = db.query(func.count(UserProgress.id)).join(
-            Content, UserProgress.content_id == Content.id
-        ).filter(
-            UserProgress.user_id == user_id,
-            UserProgress.is_completed == True,
-            Content.is_published == True
-        ).scalar()
-
-        return completed_content >= total_content
+        return total_content > 0 and completed_content >= total_content
 
     def check_module_completion(
         self,
@@ -706,26 +834,11 @@ class ProgressService:
         Returns:
             True if all published content in module is completed, False otherwise
         """
-        # Get total published content count in this module
-        total_content = db.query(func.count(Content.id)).filter(
-            Content.module_id == module_id,
-            Content.is_published == True
-        ).scalar()
-
-        if total_content == 0:
-            return False
-
-        # Get completed content count for this user in this module
-        completed_content = db.query(func.count(UserProgress.id)).join(
-            Content, UserProgress.content_id == Content.id
-        ).filter(
-            UserProgress.user_id == user_id,
-            UserProgress.is_completed == True,
-            Content.module_id == module_id,
-            Content.is_published == True
-        ).scalar()
+        total_content, completed_content = self._get_completion_counts(
+            db, user_id, module_id
+        )
 
-        return completed_content >= total_content
+        return total_content > 0 and completed_content >= total_content
 
     def mark_course_completed(
         self,
@@ -767,10 +880,12 @@ class ProgressService:
         - Course structure changes
         
         The method:
-        1. Iterates through all enrollments
-        2. Recalculates progress percentage for each
+        1. Counts completed content for every user in one grouped query
+        2. Recalculates progress percentage for each enrollment
         3. Resets completion status if new content was added
         4. Marks as complete if all content is now finished
+        5. Resyncs each enrollment's completed content count
+        6. Writes back only the enrollments that changed, in bulk batches
         
         Args:
             db: Database session
@@ -779,53 +894,101 @@ class ProgressService:
             Number of enrollments updated
         """
         try:
-            # Get all enrollments
-            enrollments = db.query(Enrollment).all()
-            
-            updated_count = 0
-            
             # Get total published content count (same for all users)
-            total_content = db.query(func.count(Content.id)).filter(
-                Content.is_published == True
-            ).scalar()
+            total_content = self._get_total_published_content(db)
             
             if total_content == 0:
                 return 0
             
-            for enrollment in enrollments:
-                # Get completed content count for this user
-                completed_content = db.query(func.count(UserProgress.id)).join(
-                    Content, UserProgress.content_id == Content.id
-                ).filter(
-                    UserProgress.user_id == enrollment.user_id,
+            # Completed content counts for all users at once
+            completed_by_user = (
+                db.query(
+                    UserProgress.user_id.label("user_id"),
+                    func.count(UserProgress.id).label("completed")
+                )
+                .join(Content, UserProgress.content_id == Content.id)
+                .filter(
                     UserProgress.is_completed == True,
                     Content.is_published == True
-                ).scalar()
-                
+                )
+                .group_by(UserProgress.user_id)
+                .subquery()
+            )
+            
+            completed = func.coalesce(completed_by_user.c.completed, 0)
+            
+            # Enrollments whose stored state may be out of date. Rows already
+            # holding the right count, the nearest-hundredth percentage and a
+            # matching completion state are left in the database; the rest
+            # are rechecked below, where exact ties are resolved
+            stale = or_(
+                Enrollment.completed_content_count != completed,
+                func.abs(
+                    Enrollment.progress_percentage * (200 * total_content) - completed * 20000
+                ) >= total_content,
+                and_(
+                    Enrollment.completed_at.is_(None),
+                    completed * 10000 >= total_content * 9999
+                ),
+                and_(
+                    Enrollment.completed_at.isnot(None),
+                    completed < total_content
+                )
+            )
+            
+            # Only the columns needed to compute the new state, streamed in
+            # batches so memory stays flat however many users are enrolled
+            enrollments = db.query(
+                Enrollment.id,
+                Enrollment.progress_percentage,
+                Enrollment.completed_at,
+                Enrollment.completed_content_count,
+                completed
+            ).outerjoin(
+                completed_by_user, completed_by_user.c.user_id == Enrollment.user_id
+            ).filter(stale).yield_per(ENROLLMENT_STREAM_BATCH_SIZE)
+            
+            # Every enrollment completed by this run shares one timestamp
+            now = datetime.utcnow()
+            updated_count = 0
+            changes = []
+            
+            for enrollment_id, progress_percentage, completed_at, completed_count, completed_content in enrollments:
                 # Calculate new progress percentage
                 new_progress = self.calculate_progress_percentage(
                     completed_content, total_content
                 )
                 
                 # Store old values for comparison
-                old_progress = float(enrollment.progress_percentage) if enrollment.progress_percentage else 0.0
-                was_completed = enrollment.completed_at is not None
+                old_progress = progress_percentage if progress_percentage else _ZERO_PERCENT
+                was_completed = completed_at is not None
                 
-                # Update progress percentage
-                enrollment.progress_percentage = Decimal(str(new_progress))
+                new_completed_at = completed_at
                 
                 # Handle completion status changes
                 if new_progress < 100 and was_completed:
                     # Course was completed but now has new content - reset completion
-                    enrollment.completed_at = None
+                    new_completed_at = None
                     updated_count += 1
                 elif new_progress >= 100 and not was_completed:
                     # Course is now completed
-                    enrollment.completed_at = datetime.utcnow()
+                    new_completed_at = now
                     updated_count += 1
-                elif abs(old_progress - new_progress) > 0.01:
+                elif abs(old_progress - new_progress) > _PROGRESS_TOLERANCE:
                     # Progress changed but completion status didn't
                     updated_count += 1
+                
+                if (
+                    new_progress != progress_percentage
+                    or new_completed_at != completed_at
+                    or completed_content != completed_count
+                ):
+                    changes.append((enrollment_id, new_progress, new_completed_at, completed_content))
+                    if len(changes) >= ENROLLMENT_STREAM_BATCH_SIZE:
+                        self._write_enrollment_progress(db, changes)
+                        changes = []
+            
+            self._write_enrollment_progress(db, changes)
             
             db.commit()
             return updated_count
@@ -834,6 +997,121 @@ class ProgressService:
             db.rollback()
             raise
 
+    def _get_total_published_content(self, db: Session) -> int:
+        """
+        Count published content across the course.
+        
+        Every course-wide progress calculation divides by this number, so it
+        is read through this one helper and memoized for the session.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Number of published content items
+        """
+        totals = db.info.setdefault(_TOTALS_CACHE_KEY, {})
+        if None not in totals:
+            totals[None] = db.query(func.count(Content.id)).filter(
+                Content.is_published == True
+            ).scalar()
+        return totals[None]
+
+    def _get_completion_counts(
+        self,
+        db: Session,
+        user_id: str,
+        module_id: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Count published content and how much of it the user has completed.
+        
+        Both numbers come from one LEFT JOIN. The course-wide total is
+        memoized for the session like _get_total_published_content.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            module_id: Restrict to this module, or None for the whole course
+            
+        Returns:
+            Tuple of (total_content, completed_content)
+        """
+        # Built as a lambda statement: this runs on every completion check,
+        # and the construct and its cache key are reused across calls with
+        # only user_id/module_id bound fresh
+        stmt = lambda_stmt(lambda: select(
+            func.count(Content.id),
+            func.count(UserProgress.id)
+        ).select_from(Content).outerjoin(
+            UserProgress,
+            and_(
+                UserProgress.content_id == Content.id,
+                UserProgress.user_id == user_id,
+                UserProgress.is_completed == True
+            )
+        ).where(Content.is_published == True))
+
+        if module_id is not None:
+            stmt += lambda s: s.where(Content.module_id == module_id)
+
+        total_content, completed_content = db.execute(stmt).one()
+        if module_id is None:
+            db.info.setdefault(_TOTALS_CACHE_KEY, {})[None] = total_content
+        return total_content, completed_content
+
+    def _write_enrollment_progress(
+        self,
+        db: Session,
+        changes: List[Tuple[str, Decimal, Optional[datetime], int]]
+    ) -> None:
+        """
+        Write recalculated enrollment progress back in bulk.
+        
+        On PostgreSQL each batch is a single UPDATE ... FROM (VALUES ...)
+        statement; other databases fall back to an executemany UPDATE.
+        
+        Args:
+            db: Database session
+            changes: (enrollment_id, progress_percentage, completed_at,
+                completed_content_count) tuples
+        """
+        if not changes:
+            return
+        
+        if db.get_bind().dialect.name != "postgresql":
+            db.bulk_update_mappings(Enrollment, [
+                {
+                    "id": enrollment_id,
+                    "progress_percentage": pct,
+                    "completed_at": completed_at,
+                    "completed_content_count": completed_count
+                }
+                for enrollment_id, pct, completed_at, completed_count in changes
+            ])
+            return
+        
+        for start in range(0, len(changes), ENROLLMENT_WRITEBACK_BATCH_SIZE):
+            rows = values(
+                column("id", String),
+                column("progress_percentage", Numeric(5, 2)),
+                column("completed_at", DateTime),
+                column("completed_content_count", Integer),
+                name="v"
+            ).data(changes[start:start + ENROLLMENT_WRITEBACK_BATCH_SIZE])
+            
+            # Casts keep the column types when a batch holds only NULLs
+            db.execute(
+                update(Enrollment)
+                .where(Enrollment.id == rows.c.id)
+                .values(
+                    progress_percentage=cast(rows.c.progress_percentage, Numeric(5, 2)),
+                    completed_at=cast(rows.c.completed_at, DateTime),
+                    completed_content_count=cast(rows.c.completed_content_count, Integer)
+                )
+                .execution_options(synchronize_session=False)
+            )
+
 
 # Create singleton instance
 progress_service = ProgressService()
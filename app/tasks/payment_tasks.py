@@ -38,7 +38,7 @@ def retry_failed_webhooks():
         # Find payments that need webhook retry
         payments_to_retry = db.query(Payment).filter(
             Payment.status == PaymentStatus.PENDING.value,
-            Payment.webhook_attempts < "5"
+            Payment.webhook_attempts < 5
         ).all()
         
         retry_count = 0
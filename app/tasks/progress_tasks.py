@@ -0,0 +1,28 @@
+"""
+Background tasks for progress tracking.
+"""
+import logging
+from app.database import SessionLocal
+from app.services.progress_service import progress_service
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_enrollment_progress():
+    """
+    Background task to resync denormalized enrollment progress.
+    Recounts completed content for every enrollment so counter drift (e.g.
+    from content deleted with its module) is corrected.
+    Should be run periodically (e.g., weekly via cron or scheduler).
+    """
+    db = SessionLocal()
+    try:
+        count = progress_service.recalculate_all_enrollments(db)
+        if count > 0:
+            logger.info(f"Reconciled progress for {count} enrollments")
+        return count
+    except Exception as e:
+        logger.error(f"Error reconciling enrollment progress: {str(e)}")
+        return 0
+    finally:
+        db.close()
@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+
+from app.services import email_templates as et
+
+NAME = "Ann O'Neil <&>"
+URL = "https://example.com/path?a=1&b=2"
+
+RENDERED = {
+    "verification": lambda: et.get_verification_email_template(NAME, URL),
+    "password_reset": lambda: et.get_password_reset_email_template(NAME, URL),
+    "welcome": lambda: et.get_welcome_email_template(NAME, URL),
+    "course_completion": lambda: et.get_course_completion_email_template(
+        NAME, URL, "FFW-123", URL, URL
+    ),
+    "signature_confirmation": lambda: et.get_signature_confirmation_email_template(NAME, URL),
+    "notification": lambda: et.get_notification_email_template(
+        NAME, "Title & more", "Line one\nLine <two>", URL
+    ),
+}
+
+
+def assert_resolved(html: str) -> None:
+    assert "{" not in html and "}" not in html
+    assert "<style" not in html
+    assert 'class="' not in html
+    assert html.startswith("<!DOCTYPE html>") and html.endswith("</html>")
+
+
+@pytest.mark.parametrize("name", sorted(RENDERED))
+def test_helpers_render_fully_resolved(name):
+    body = RENDERED[name]()
+
+    assert_resolved(body.html)
+    assert "{" not in body.text and "}" not in body.text
+    # Values are escaped in the HTML part and left as-is in the text part
+    assert "<&>" not in body.html
+    if name != "welcome":  # the welcome email does not greet by name
+        assert "O&#x27;Neil &lt;&amp;&gt;" in body.html
+        assert NAME in body.text
+    assert URL.replace("&", "&amp;") in body.html
+    assert URL in body.text
+
+
+def test_base_template_variants_match():
+    html = et.get_base_template("Title", "<p>Body</p>")
+
+    assert_resolved(html)
+    assert et.get_base_template_bytes("Title", "<p>Body</p>") == html.encode("utf-8")
+    assert gzip.decompress(et.get_base_template_gz("Title", "<p>Body</p>")) == html.encode("utf-8")
+
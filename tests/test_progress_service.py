@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401 - registers every table on Base.metadata
+from app.database import Base
+from app.models.content import Content
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.module import Module
+from app.models.user import User
+from app.models.user_progress import UserProgress
+from app.schemas.progress import ProgressUpdateRequest
+from app.services.progress_service import PROGRESS_TOUCH_INTERVAL, progress_service
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+
+    course = Course(title="Course", description="d", price=1, instructor_name="i")
+    session.add(course)
+    session.flush()
+    session.add(Module(id="m1", course_id=course.id, title="M1", order_index=0, is_published=True))
+    for i in range(4):
+        session.add(Content(
+            id=f"c{i}", module_id="m1", title=f"C{i}",
+            content_type="video", order_index=i, is_published=True
+        ))
+    session.add(User(
+        id="u1", email="u1@example.com", full_name="U", password_hash="x", phone_number="1"
+    ))
+    session.flush()
+    session.add(Enrollment(user_id="u1", progress_percentage=0))
+    session.commit()
+
+    yield session
+    session.close()
+
+
+def _update(db, content_id, is_completed):
+    progress_service.update_progress(
+        db, "u1", content_id, ProgressUpdateRequest(is_completed=is_completed)
+    )
+    enrollment = db.query(Enrollment).filter(Enrollment.user_id == "u1").one()
+    return enrollment.completed_content_count, enrollment.progress_percentage
+
+
+def test_enrollment_percentage_follows_completion_changes(db):
+    assert _update(db, "c0", True) == (1, Decimal("25.00"))
+    assert _update(db, "c1", True) == (2, Decimal("50.00"))
+
+    # Undoing a completion lowers the percentage straight away
+    assert _update(db, "c0", False) == (1, Decimal("25.00"))
+
+    # Replays of the current state leave count and percentage alone
+    assert _update(db, "c1", True) == (1, Decimal("25.00"))
+    assert _update(db, "c0", False) == (1, Decimal("25.00"))
+    assert _update(db, "c2", False) == (1, Decimal("25.00"))
+
+    assert _update(db, "c0", True) == (2, Decimal("50.00"))
+
+
+def test_replay_only_touches_stale_access_time(db):
+    _update(db, "c0", True)
+    progress = db.query(UserProgress).filter(UserProgress.content_id == "c0").one()
+
+    recent = datetime.utcnow() - PROGRESS_TOUCH_INTERVAL / 2
+    progress.updated_at = recent
+    db.commit()
+    _update(db, "c0", True)
+    assert progress.updated_at == recent
+
+    stale = datetime.utcnow() - PROGRESS_TOUCH_INTERVAL - timedelta(seconds=1)
+    progress.updated_at = stale
+    db.commit()
+    _update(db, "c0", True)
+    assert progress.updated_at > stale